@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应并发控制，负责按API的限流反馈调整并发数并对失败的调用做带抖动的重试
+"""
+
+import random
+import threading
+import time
+
+# 调用结果分类
+OUTCOME_SUCCESS = 'success'      # 调用成功
+OUTCOME_OVERLOAD = 'overload'    # 429限流或超时，需要降低并发
+OUTCOME_RETRYABLE = 'retryable'  # 5xx或连接错误，可重试但不降低并发
+OUTCOME_FATAL = 'fatal'          # 参数错误、鉴权失败等，重试无意义
+
+def classify_error(error):
+    """
+    判断调用异常的类型
+
+    Args:
+        error: 调用抛出的异常
+
+    Returns:
+        str: OUTCOME_OVERLOAD / OUTCOME_RETRYABLE / OUTCOME_FATAL
+    """
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None and getattr(error, 'response', None) is not None:
+        status_code = getattr(error.response, 'status_code', None)
+    if status_code == 429 or status_code in (408, 504):
+        return OUTCOME_OVERLOAD
+    # openai.APITimeoutError、httpx.TimeoutException 等
+    if isinstance(error, TimeoutError) or 'Timeout' in type(error).__name__:
+        return OUTCOME_OVERLOAD
+    if status_code is not None and status_code >= 500:
+        return OUTCOME_RETRYABLE
+    if status_code is None and ('Connection' in type(error).__name__ or isinstance(error, ConnectionError)):
+        return OUTCOME_RETRYABLE
+    return OUTCOME_FATAL
+
+def retry_after_seconds(error):
+    """
+    读取限流响应中建议的等待时间
+
+    Args:
+        error: 调用抛出的异常
+
+    Returns:
+        float: 建议等待的秒数，没有时返回None
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+class AdaptiveLimiter:
+    """AIMD并发限制器类：成功时加性增加并发上限，限流或超时时乘性减小"""
+
+    def __init__(self, initial=4, min_limit=1, max_limit=16, increase=1.0, decrease_factor=0.5, cooldown=1.0):
+        """
+        初始化并发限制器
+
+        Args:
+            initial: 初始并发数
+            min_limit: 并发数下限
+            max_limit: 并发数上限
+            increase: 每完成约“当前并发数”个成功调用后增加的并发数
+            decrease_factor: 限流或超时时并发数乘以的系数（0-1）
+            cooldown: 两次减小之间的最短间隔（秒），同一波限流只减小一次
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self):
+        """当前生效的并发数"""
+        return int(self._limit)
+
+    def acquire(self):
+        """等待直到正在进行的调用数低于当前并发数"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, outcome=OUTCOME_SUCCESS):
+        """
+        归还并发名额并根据调用结果调整并发数
+
+        Args:
+            outcome: 调用结果分类
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if outcome == OUTCOME_SUCCESS:
+                previous = int(self._limit)
+                self._limit = min(self.max_limit, self._limit + self.increase / max(1.0, self._limit))
+                self.increases += int(self._limit) > previous
+            elif outcome == OUTCOME_OVERLOAD:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+                    self.decreases += 1
+            self._condition.notify_all()
+
+class RetryPolicy:
+    """重试策略类，指数退避加全抖动"""
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=20.0):
+        """
+        初始化重试策略
+
+        Args:
+            max_attempts: 每个标题最多调用的次数（含第一次）
+            base_delay: 第一次重试的退避基数（秒）
+            max_delay: 单次退避的上限（秒）
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        """
+        计算第attempt次失败后的等待时间
+
+        Args:
+            attempt: 已失败的次数（从1开始）
+            retry_after: 服务端建议的等待时间（秒），可选，作为下限
+
+        Returns:
+            float: 等待秒数
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        # 全抖动，避免所有线程在同一时刻重试
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+class GenerationController:
+    """生成调用控制器类，组合并发限制器和重试策略"""
+
+    def __init__(self, limiter=None, retry_policy=None):
+        """
+        初始化生成调用控制器
+
+        Args:
+            limiter: 并发限制器（AdaptiveLimiter），可选
+            retry_policy: 重试策略（RetryPolicy），可选
+        """
+        self.limiter = limiter or AdaptiveLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.calls = 0
+        self.retries = 0
+        self.overloads = 0
+        self._lock = threading.Lock()
+
+    def call(self, func, *args, **kwargs):
+        """
+        在并发限制下调用func，失败时按重试策略重试，重试次数用尽后抛出最后一次的异常
+
+        Args:
+            func: 被调用的函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            func的返回值
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self.limiter.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                outcome = classify_error(e)
+                self.limiter.release(outcome)
+                with self._lock:
+                    self.calls += 1
+                    self.overloads += outcome == OUTCOME_OVERLOAD
+                if outcome == OUTCOME_FATAL or attempt >= self.retry_policy.max_attempts:
+                    raise
+                delay = self.retry_policy.delay(attempt, retry_after_seconds(e))
+                with self._lock:
+                    self.retries += 1
+                # 等待期间不占用并发名额
+                time.sleep(delay)
+                continue
+            self.limiter.release(OUTCOME_SUCCESS)
+            with self._lock:
+                self.calls += 1
+            return result
+
+    def stats(self):
+        """
+        获取调用统计
+
+        Returns:
+            dict: 调用次数、重试次数、限流/超时次数、当前并发数及并发数调整次数
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'overloads': self.overloads,
+                'limit': self.limiter.limit,
+                'increases': self.limiter.increases,
+                'decreases': self.limiter.decreases
+            }
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试：在本地模拟LLM服务上运行 process_excel，按并发数和表格行数统计吞吐量与尾延迟
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import openpyxl
+from adaptive_concurrency import AdaptiveLimiter, RetryPolicy, GenerationController
+from llm_client import GenerationClient
+from main import process_excel
+from mock_llm_server import MockLLMServer
+from timing import percentile
+
+class _TimedClient:
+    """记录每次生成耗时和失败次数的客户端包装"""
+
+    def __init__(self, client):
+        """
+        初始化客户端包装
+
+        Args:
+            client: 实际的生成客户端
+        """
+        self.client = client
+        self.cache = None
+        # generate_rows按SDK重试次数决定默认控制器是否重试
+        self.max_retries = client.max_retries
+        self.latencies = []
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, title):
+        """查询实际客户端的单条生成缓存"""
+        return self.client.lookup(title)
+
+    def lookup_batch(self, titles):
+        """查询实际客户端的批量生成缓存"""
+        return self.client.lookup_batch(titles)
+
+    def generate(self, title, use_cache=True):
+        """调用实际客户端生成内容并记录耗时"""
+        return self._timed(self.client.generate, title, use_cache=use_cache)
+
+    def generate_batch(self, titles, use_cache=True):
+        """调用实际客户端批量生成内容并记录耗时"""
+        return self._timed(self.client.generate_batch, titles, use_cache=use_cache)
+
+    def _timed(self, func, *args, **kwargs):
+        """调用func并记录耗时和失败次数"""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - start)
+
+def _format_seconds(value, width=9):
+    """格式化耗时，没有样本（值为None）时显示为-"""
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.3f}"
+
+def _make_sheet(path, rows):
+    """创建只有标题、正文为空的测试工作簿"""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['标题', '内容', '图片', '标签', '分类'])
+    for index in range(rows):
+        sheet.append([f"基准测试标题{index}", None, None, None, None])
+    workbook.save(path)
+    workbook.close()
+
+def run_case(server, rows, concurrency, max_retries=2, adaptive_max=None, retry_attempts=4, stream=False,
+             batch_size=1):
+    """
+    运行一组参数并返回统计结果
+
+    Args:
+        server: 已启动的模拟LLM服务
+        rows: 表格行数
+        concurrency: 生成并发数（自适应模式下为初始并发数）
+        max_retries: OpenAI SDK内置的重试次数，自适应模式下不使用
+        adaptive_max: 自适应并发上限，可选，提供时由GenerationController负责并发调整和重试
+        retry_attempts: 自适应模式下每个标题最多调用的次数
+        stream: 是否流式生成
+        batch_size: 每个请求包含的标题数
+
+    Returns:
+        dict: 统计结果
+    """
+    work_dir = tempfile.mkdtemp(prefix='bench_generation_')
+    excel_path = os.path.join(work_dir, 'bench.xlsx')
+    _make_sheet(excel_path, rows)
+    status_before = dict(server.status_counts)
+    sent_before = server.sent_chars
+    requests_before = server.request_count
+    connections_before = server.connection_count
+    controller = None
+    if adaptive_max:
+        controller = GenerationController(AdaptiveLimiter(initial=concurrency, max_limit=max(concurrency, adaptive_max)),
+                                          RetryPolicy(max_attempts=retry_attempts))
+        max_retries = 0
+    try:
+        with GenerationClient(api_key='mock', base_url=server.base_url, max_retries=max_retries,
+                              stream=stream) as client:
+            timed_client = _TimedClient(client)
+            start = time.perf_counter()
+            # 屏蔽逐行日志，只输出汇总
+            with contextlib.redirect_stdout(io.StringIO()):
+                notes = process_excel(excel_path, concurrency=concurrency, client=timed_client, resume=False,
+                                      controller=controller, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    latencies = timed_client.latencies
+    return {
+        'rows': rows,
+        'concurrency': concurrency,
+        'elapsed': elapsed,
+        'rows_per_sec': rows / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'max': max(latencies) if latencies else None,
+        'failures': timed_client.failures,
+        'fallbacks': sum(1 for note in notes if note.is_fallback),
+        'rate_limited': server.status_counts.get(429, 0) - status_before.get(429, 0),
+        'server_errors': server.status_counts.get(500, 0) - status_before.get(500, 0),
+        'sent_chars': server.sent_chars - sent_before,
+        'requests': server.request_count - requests_before,
+        'connections': server.connection_count - connections_before
+    }
+
+def run_benchmark(sheet_sizes=(20, 100), concurrency_levels=(1, 4, 8, 16), latency=0.05, latency_jitter=0.05,
+                  error_rate=0.0, rate_limit_rate=0.0, max_concurrency=None, max_retries=2, adaptive_max=None,
+                  retry_attempts=4, content_length=None, chunk_latency=0.0, stream=False, batch_sizes=(1,),
+                  batch_malformed_rate=0.0):
+    """
+    按表格行数和并发数扫描并打印结果表
+
+    Args:
+        sheet_sizes: 表格行数列表
+        concurrency_levels: 并发数列表
+        latency: 模拟生成耗时（秒）
+        latency_jitter: 模拟生成耗时的随机波动上限（秒）
+        error_rate: 模拟500错误比例
+        rate_limit_rate: 模拟429限流比例
+        max_concurrency: 模拟账号并发配额，超过时返回429，可选
+        max_retries: OpenAI SDK内置的重试次数
+        adaptive_max: 自适应并发上限，可选，提供时使用自适应并发控制和带抖动的重试
+        retry_attempts: 自适应模式下每个标题最多调用的次数
+        content_length: 模拟生成内容的字符数，可选
+        chunk_latency: 模拟每20个字符的生成耗时（秒）
+        stream: 是否流式生成，流式时达到字数上限后提前断开（该连接不再复用）
+        batch_sizes: 每个请求包含的标题数列表
+        batch_malformed_rate: 模拟批量响应格式错误的比例
+
+    Returns:
+        list: 每组参数的统计结果
+    """
+    print(f"模拟生成耗时: {latency}s（波动 {latency_jitter}s），500比例: {error_rate}，429比例: {rate_limit_rate}，"
+          f"并发配额: {max_concurrency or '不限'}，"
+          + (f"自适应并发上限: {adaptive_max}，最多调用次数: {retry_attempts}" if adaptive_max else f"SDK重试次数: {max_retries}"))
+    if content_length:
+        print(f"模拟内容长度: {content_length}字，每20字耗时: {chunk_latency}s，{'流式' if stream else '非流式'}生成")
+    if batch_malformed_rate:
+        print(f"批量响应格式错误比例: {batch_malformed_rate}")
+    print("-" * 130)
+    print(f"{'行数':>6}{'并发':>6}{'批量':>6}{'耗时(s)':>10}{'行/秒':>10}{'p50(s)':>9}{'p95(s)':>9}{'p99(s)':>9}"
+          f"{'max(s)':>9}{'失败':>6}{'兜底':>6}{'429':>6}{'500':>6}{'接收字数':>10}{'请求数':>8}{'连接数':>8}")
+    results = []
+    with MockLLMServer(latency=latency, handshake_latency=0.0, latency_jitter=latency_jitter, error_rate=error_rate,
+                       rate_limit_rate=rate_limit_rate, max_concurrency=max_concurrency, seed=0,
+                       content_length=content_length, chunk_latency=chunk_latency,
+                       batch_malformed_rate=batch_malformed_rate) as server:
+        for rows in sheet_sizes:
+            for concurrency in concurrency_levels:
+                for batch_size in batch_sizes:
+                    result = run_case(server, rows, concurrency, max_retries, adaptive_max, retry_attempts, stream,
+                                      batch_size)
+                    results.append(result)
+                    print(f"{rows:>6}{concurrency:>6}{batch_size:>6}{result['elapsed']:>10.2f}{result['rows_per_sec']:>10.1f}"
+                          f"{_format_seconds(result['p50'])}{_format_seconds(result['p95'])}"
+                          f"{_format_seconds(result['p99'])}{_format_seconds(result['max'])}"
+                          f"{result['failures']:>6}{result['fallbacks']:>6}{result['rate_limited']:>6}"
+                          f"{result['server_errors']:>6}{result['sent_chars']:>10}{result['requests']:>8}"
+                          f"{result['connections']:>8}")
+    return results
+
+def _int_list(value):
+    """解析逗号分隔的整数列表"""
+    return [int(item) for item in value.split(',') if item.strip()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='内容生成吞吐量基准测试')
+    parser.add_argument('--rows', type=_int_list, default=[20, 100], help='表格行数，逗号分隔（默认20,100）')
+    parser.add_argument('--concurrency', type=_int_list, default=[1, 4, 8, 16], help='并发数，逗号分隔（默认1,4,8,16）')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟生成耗时（秒）')
+    parser.add_argument('--jitter', type=float, default=0.05, help='模拟生成耗时的随机波动上限（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='模拟500错误比例（0-1）')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='模拟429限流比例（0-1）')
+    parser.add_argument('--max-concurrency', type=int, default=None, help='模拟账号并发配额，超过时返回429')
+    parser.add_argument('--max-retries', type=int, default=2, help='OpenAI SDK内置的重试次数')
+    parser.add_argument('--adaptive-max', type=int, default=None,
+                        help='启用自适应并发控制并指定并发上限（--concurrency作为初始并发数）')
+    parser.add_argument('--retry-attempts', type=int, default=4, help='自适应模式下每个标题最多调用的次数')
+    parser.add_argument('--content-length', type=int, default=None,
+                        help='模拟生成内容的字符数（如1500，模拟max_tokens=1000时的完整响应）')
+    parser.add_argument('--chunk-latency', type=float, default=0.0, help='模拟每20个字符的生成耗时（秒）')
+    parser.add_argument('--stream', action='store_true', help='流式生成，达到字数上限后提前断开')
+    parser.add_argument('--batch-size', type=_int_list, default=[1], help='每个请求包含的标题数，逗号分隔（默认1）')
+    parser.add_argument('--batch-malformed-rate', type=float, default=0.0, help='模拟批量响应格式错误的比例（0-1）')
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.concurrency, args.latency, args.jitter, args.error_rate,
+                  args.rate_limit_rate, args.max_concurrency, args.max_retries, args.adaptive_max, args.retry_attempts,
+                  args.content_length, args.chunk_latency, args.stream, args.batch_size,
+                  args.batch_malformed_rate)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试：每行新建OpenAI客户端 vs 共享长连接GenerationClient
+"""
+
+import argparse
+import time
+from openai import OpenAI
+from llm_client import GenerationClient, DEFAULT_MODEL, DEFAULT_SYSTEM_PROMPT
+from mock_llm_server import MockLLMServer
+
+def _per_row_client(base_url, titles):
+    """旧实现：每个标题都新建一个OpenAI客户端"""
+    for title in titles:
+        client = OpenAI(api_key='mock', base_url=base_url)
+        client.chat.completions.create(
+            model=DEFAULT_MODEL,
+            messages=[
+                {"role": "system", "content": DEFAULT_SYSTEM_PROMPT},
+                {"role": "user", "content": f"标题：{title}"}
+            ],
+            max_tokens=1000,
+            temperature=1.3
+        )
+
+def _shared_client(base_url, titles):
+    """新实现：所有标题共享同一个长连接客户端"""
+    with GenerationClient(api_key='mock', base_url=base_url) as client:
+        for title in titles:
+            client.generate(title)
+
+def run_benchmark(rows=50, latency=0.02, handshake_latency=0.05):
+    """
+    运行基准测试并打印结果
+
+    Args:
+        rows: 模拟的行数
+        latency: 模拟的生成耗时（秒）
+        handshake_latency: 模拟的新连接握手耗时（秒）
+    """
+    titles = [f"测试标题{i}" for i in range(rows)]
+    print(f"行数: {rows}，模拟生成耗时: {latency}s，模拟握手耗时: {handshake_latency}s")
+    print("-" * 60)
+
+    for name, func in (("每行新建客户端", _per_row_client), ("共享长连接客户端", _shared_client)):
+        with MockLLMServer(latency=latency, handshake_latency=handshake_latency) as server:
+            start = time.perf_counter()
+            func(server.base_url, titles)
+            elapsed = time.perf_counter() - start
+            per_row = elapsed / rows
+            overhead = per_row - latency
+            print(f"{name}: 总耗时 {elapsed:.2f}s，每行 {per_row * 1000:.1f}ms，"
+                  f"每行额外开销 {overhead * 1000:.1f}ms，新建连接数 {server.connection_count}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='LLM客户端连接复用基准测试')
+    parser.add_argument('--rows', type=int, default=50, help='模拟的行数')
+    parser.add_argument('--latency', type=float, default=0.02, help='模拟的生成耗时（秒）')
+    parser.add_argument('--handshake-latency', type=float, default=0.05, help='模拟的新连接握手耗时（秒）')
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.latency, args.handshake_latency)
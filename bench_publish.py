@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试：在本地模拟发布页上运行 Publisher.publish_note，统计每分钟发布笔记数
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from browser_manager import BrowserManager
+from creator_fixture import CreatorFixtureServer
+from placeholder_images import _write_png
+from popup_handler import PopupHandler
+from publisher import Publisher
+from timing import SpanRecorder
+
+def _make_images(directory, count, size=256):
+    """生成若干张测试图片，返回路径列表"""
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"bench_{index}.png")
+        _write_png(path, size, size, (40 + index * 20 % 190, 120, 200))
+        paths.append(path)
+    return paths
+
+def run_benchmark(notes=10, images=2, page_latency=0.2, upload_latency=0.5, publish_latency=0.3,
+                  headless=True, driver_path='./chromedriver.exe', debug_port=9333):
+    """
+    运行发布基准测试并打印结果
+
+    Args:
+        notes: 发布的笔记数
+        images: 每条笔记的图片数
+        page_latency: 模拟发布页加载耗时（秒）
+        upload_latency: 模拟每张图片上传耗时（秒）
+        publish_latency: 模拟发布接口耗时（秒）
+        headless: 是否使用无头模式
+        driver_path: ChromeDriver的路径
+        debug_port: 基准测试浏览器的调试端口，避免与日常使用的浏览器冲突
+
+    Returns:
+        float: 每分钟发布的笔记数
+    """
+    work_dir = tempfile.mkdtemp(prefix='bench_publish_')
+    image_paths = _make_images(work_dir, images)
+    spans = SpanRecorder()
+    browser_manager = BrowserManager(headless=headless, driver_path=driver_path, debug_port=debug_port,
+                                     profile_dir=os.path.join(work_dir, 'profile'))
+    print(f"笔记数: {notes}，每条图片数: {images}，模拟耗时: 页面 {page_latency}s / "
+          f"每张图片 {upload_latency}s / 发布 {publish_latency}s")
+    print("-" * 60)
+
+    try:
+        with CreatorFixtureServer(page_latency=page_latency, upload_latency=upload_latency,
+                                  publish_latency=publish_latency) as fixture:
+            driver, wait = browser_manager.initialize_browser()
+            publisher = Publisher(driver, wait, PopupHandler(driver, wait), spans=spans,
+                                  publish_url=fixture.publish_url)
+
+            succeeded = 0
+            start = time.perf_counter()
+            for index in range(notes):
+                note_data = {
+                    'row': index + 2,
+                    'title': f"基准测试标题{index}",
+                    'content': f"基准测试正文{index}。" * 20,
+                    'tags': ['基准测试', '自动发布'],
+                    'image_paths': image_paths
+                }
+                succeeded += bool(publisher.publish_note(note_data))
+            elapsed = time.perf_counter() - start
+
+            throughput = notes / elapsed * 60
+            print("-" * 60)
+            print(f"总耗时 {elapsed:.2f}s，成功 {succeeded}/{notes} 条，模拟服务收到 {len(fixture.published)} 条")
+            print(f"吞吐量: {throughput:.1f} 条/分钟，每条 {elapsed / notes:.2f}s")
+            spans.print_summary('publish.')
+            return throughput
+    finally:
+        browser_manager.close_browser()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='离线发布吞吐量基准测试')
+    parser.add_argument('--notes', type=int, default=10, help='发布的笔记数')
+    parser.add_argument('--images', type=int, default=2, help='每条笔记的图片数')
+    parser.add_argument('--page-latency', type=float, default=0.2, help='模拟发布页加载耗时（秒）')
+    parser.add_argument('--upload-latency', type=float, default=0.5, help='模拟每张图片上传耗时（秒）')
+    parser.add_argument('--publish-latency', type=float, default=0.3, help='模拟发布接口耗时（秒）')
+    parser.add_argument('--show-browser', action='store_true', help='显示浏览器窗口（默认无头模式）')
+    parser.add_argument('--driver-path', default='./chromedriver.exe', help='ChromeDriver的路径')
+    parser.add_argument('--debug-port', type=int, default=9333, help='基准测试浏览器的调试端口')
+    args = parser.parse_args()
+    run_benchmark(args.notes, args.images, args.page_latency, args.upload_latency, args.publish_latency,
+                  headless=not args.show_browser, driver_path=args.driver_path, debug_port=args.debug_port)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试：启动耗时（主程序导入、浏览器复用检测、首个浏览器操作）
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def measure_import(module='main', repeats=5):
+    """
+    在独立子进程中测量导入模块的耗时
+
+    Args:
+        module: 模块名
+        repeats: 重复次数
+
+    Returns:
+        float: 导入耗时中位数（秒）
+    """
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+def legacy_process_scan(debug_port):
+    """旧实现：遍历主机上所有进程查找监听调试端口的Chrome"""
+    import psutil
+
+    found = []
+    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        if proc.info['name'] in ['chrome.exe', 'chrome']:
+            cmdline = proc.info.get('cmdline') or []
+            if any(f'--remote-debugging-port={debug_port}' in arg for arg in cmdline):
+                found.append(proc)
+    return bool(found)
+
+def _start_fake_devtools():
+    """启动一个模拟 /json/version 接口的本地服务，返回 (服务, 端口)"""
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            data = json.dumps({"Browser": "Chrome/142.0.0.0"}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+def _spawn_busy_processes(count):
+    """启动若干空闲子进程，模拟进程很多的主机"""
+    sleep_binary = shutil.which('sleep')
+    command = [sleep_binary, '300'] if sleep_binary else [sys.executable, '-c', 'import time; time.sleep(300)']
+    return [subprocess.Popen(command) for _ in range(count)]
+
+def _time_call(func, repeats=5):
+    """返回多次调用的耗时中位数（秒）"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def run_benchmark(busy_processes=100, with_browser=False):
+    """
+    运行启动耗时基准测试并打印结果
+
+    Args:
+        busy_processes: 额外启动的空闲进程数，模拟繁忙主机
+        with_browser: 是否实际启动浏览器测量首个操作耗时
+    """
+    from browser_manager import BrowserManager
+
+    print(f"导入 main 模块: {measure_import('main') * 1000:.1f}ms")
+
+    processes = _spawn_busy_processes(busy_processes)
+    server, port = _start_fake_devtools()
+    try:
+        print(f"模拟繁忙主机：额外 {busy_processes} 个进程")
+        try:
+            scan_time = _time_call(lambda: legacy_process_scan(port))
+            print(f"旧实现（psutil遍历进程）: {scan_time * 1000:.1f}ms")
+        except ImportError:
+            print("未安装psutil，跳过旧实现对比")
+
+        alive = BrowserManager(debug_port=port)
+        print(f"DevTools探测（端口有浏览器）: {_time_call(alive.probe_debug_endpoint) * 1000:.1f}ms")
+        server.shutdown()
+        server.server_close()
+        print(f"DevTools探测（端口无浏览器）: {_time_call(alive.probe_debug_endpoint) * 1000:.1f}ms")
+    finally:
+        for proc in processes:
+            proc.kill()
+        for proc in processes:
+            proc.wait()
+
+    if with_browser:
+        start = time.perf_counter()
+        manager = BrowserManager(headless=True, reuse_browser=True)
+        driver, _ = manager.initialize_browser()
+        driver.get('about:blank')
+        print(f"首个浏览器操作耗时: {(time.perf_counter() - start) * 1000:.1f}ms")
+        manager.close_browser()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='启动耗时基准测试')
+    parser.add_argument('--busy-processes', type=int, default=100, help='模拟繁忙主机的额外进程数')
+    parser.add_argument('--with-browser', action='store_true', help='实际启动浏览器，测量到首个操作的耗时')
+    args = parser.parse_args()
+    run_benchmark(args.busy_processes, args.with_browser)
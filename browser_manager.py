@@ -8,14 +8,16 @@ from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-import psutil
+import json
 import os
 import time
+import urllib.request
 
 class BrowserManager:
     """浏览器管理器类"""
     
-    def __init__(self, headless=False, driver_path='./chromedriver.exe', reuse_browser=False):
+    def __init__(self, headless=False, driver_path='./chromedriver.exe', reuse_browser=False,
+                 debug_port=9222, profile_dir=None):
         """
         初始化浏览器管理器
         
@@ -23,13 +25,16 @@ class BrowserManager:
             headless: 是否使用无头模式
             driver_path: ChromeDriver的路径
             reuse_browser: 是否尝试复用已打开的浏览器实例
+            debug_port: Chrome远程调试端口，默认9222
+            profile_dir: Chrome配置文件目录，默认为当前目录下的chrome_profile
         """
         self.headless = headless
         self.driver_path = driver_path
         self.reuse_browser = reuse_browser
         self.driver = None
         self.wait = None
-        self.debug_port = 9222  # Chrome远程调试端口
+        self.debug_port = debug_port  # Chrome远程调试端口
+        self.profile_dir = profile_dir or os.path.join(os.getcwd(), 'chrome_profile')
     
     def initialize_browser(self):
         """初始化浏览器，尝试复用已打开的实例"""
@@ -40,23 +45,18 @@ class BrowserManager:
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        chrome_options.add_argument('--user-data-dir=' + os.path.join(os.getcwd(), 'chrome_profile'))  # 使用自定义配置文件
+        chrome_options.add_argument('--user-data-dir=' + self.profile_dir)  # 使用自定义配置文件
         chrome_options.add_argument('--remote-debugging-port=' + str(self.debug_port))  # 始终添加远程调试端口
         
         # 尝试复用已打开的浏览器实例
         if self.reuse_browser:
             try:
                 print("正在尝试复用已打开的浏览器实例...")
-                # 检查是否有Chrome进程正在运行，并且监听了我们的调试端口
-                chrome_processes = []
-                for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                    if proc.info['name'] in ['chrome.exe', 'chrome']:
-                        cmdline = proc.info.get('cmdline', [])
-                        # 检查命令行参数中是否包含我们的调试端口
-                        if any(f'--remote-debugging-port={self.debug_port}' in arg for arg in cmdline):
-                            chrome_processes.append(proc)
+                # 直接查询调试端口的DevTools接口，判断是否有Chrome在监听
+                browser_version = self.probe_debug_endpoint()
                 
-                if chrome_processes:
+                if browser_version:
+                    print(f"检测到调试端口 {self.debug_port} 上的浏览器: {browser_version}")
                     # 设置debuggerAddress选项连接到已打开的Chrome实例
                     chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{self.debug_port}")
                     
@@ -66,7 +66,7 @@ class BrowserManager:
                     print("成功复用已打开的浏览器实例！")
                     return self.driver, self.wait
                 else:
-                    print("未找到运行中的Chrome进程（或未监听指定端口），将创建新的浏览器实例...")
+                    print("调试端口上没有运行中的Chrome，将创建新的浏览器实例...")
             except Exception as e:
                 print(f"复用浏览器实例失败: {e}")
                 print("将创建新的浏览器实例...")
@@ -79,6 +79,24 @@ class BrowserManager:
         
         return self.driver, self.wait
     
+    def probe_debug_endpoint(self, timeout=0.5):
+        """
+        查询调试端口的 /json/version 接口，判断是否有可复用的Chrome实例
+        
+        Args:
+            timeout: 请求超时时间（秒）
+        
+        Returns:
+            str: 浏览器版本信息，端口上没有Chrome时返回None
+        """
+        url = f"http://127.0.0.1:{self.debug_port}/json/version"
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                info = json.loads(response.read().decode('utf-8'))
+            return info.get('Browser') or 'unknown'
+        except Exception:
+            return None
+    
     def close_browser(self):
         """关闭浏览器"""
         if self.driver:
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器池，负责启动多个相互隔离的浏览器实例并行处理发布任务
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from browser_manager import BrowserManager
+from popup_handler import PopupHandler
+from login_manager import LoginManager
+from publisher import Publisher
+
+# 单个Chrome实例大致占用的内存（字节），用于估算默认并行数
+MEMORY_PER_BROWSER = 600 * 1024 * 1024
+
+class BrowserWorker:
+    """浏览器工作者类，持有一个独立的浏览器及其页面操作组件"""
+
+    def __init__(self, index, browser_manager, session_store=None, fast_popups=False, popup_observer=False):
+        """
+        初始化浏览器工作者
+
+        Args:
+            index: 工作者编号
+            browser_manager: 该工作者独占的浏览器管理器
+            session_store: 共享的登录会话存储（SessionStore），可选
+            fast_popups: 是否用单次页面内脚本扫描弹窗（PopupHandler的fast_mode）
+            popup_observer: 是否在页面内安装弹窗自动关闭观察器（仅fast_popups时生效）
+        """
+        self.index = index
+        self.browser_manager = browser_manager
+        self.session_store = session_store
+        self.fast_popups = fast_popups
+        self.popup_observer = popup_observer
+        self.driver = None
+        self.wait = None
+        self.popup_handler = None
+        self.login_manager = None
+        self.publisher = None
+
+    def start(self):
+        """启动浏览器并初始化页面操作组件"""
+        self.driver, self.wait = self.browser_manager.initialize_browser()
+        self.popup_handler = PopupHandler(self.driver, self.wait, fast_mode=self.fast_popups, observe=self.popup_observer)
+        self.login_manager = LoginManager(self.driver, self.wait, self.popup_handler, session_store=self.session_store)
+        self.publisher = Publisher(self.driver, self.wait, self.popup_handler)
+        return self
+
+    def close(self):
+        """关闭浏览器"""
+        self.browser_manager.close_browser()
+
+class BrowserPool:
+    """浏览器池类，每个工作者使用不同的调试端口和配置文件目录"""
+
+    def __init__(self, size=None, headless=False, driver_path='./chromedriver.exe',
+                 base_port=9222, profile_root='chrome_profiles', reuse_browser=False, session_store=None,
+                 fast_popups=False, popup_observer=False):
+        """
+        初始化浏览器池
+
+        Args:
+            size: 浏览器数量，None表示按CPU核数和可用内存自动估算
+            headless: 是否使用无头模式
+            driver_path: ChromeDriver的路径
+            base_port: 第一个浏览器的调试端口，后续依次加1
+            profile_root: 配置文件根目录，每个浏览器使用其下的 worker_<编号> 子目录
+            reuse_browser: 是否尝试复用已打开的浏览器实例
+            session_store: 登录会话存储（SessionStore），可选，所有浏览器共享同一份登录快照
+            fast_popups: 是否用单次页面内脚本扫描弹窗
+            popup_observer: 是否在页面内安装弹窗自动关闭观察器（仅fast_popups时生效）
+        """
+        self.size = size or self.default_size()
+        self.headless = headless
+        self.driver_path = driver_path
+        self.base_port = base_port
+        self.profile_root = os.path.abspath(profile_root)
+        self.reuse_browser = reuse_browser
+        self.session_store = session_store
+        self.fast_popups = fast_popups
+        self.popup_observer = popup_observer
+        self.workers = []
+        self._idle = queue.Queue()
+
+    @staticmethod
+    def default_size():
+        """
+        根据CPU核数和可用内存估算可并行的浏览器数量
+
+        Returns:
+            int: 浏览器数量，至少为1
+        """
+        import psutil
+        
+        cpu_slots = os.cpu_count() or 1
+        memory_slots = psutil.virtual_memory().available // MEMORY_PER_BROWSER
+        return max(1, min(cpu_slots, memory_slots))
+
+    def start(self, on_start=None):
+        """
+        并行启动所有浏览器
+
+        Args:
+            on_start: 每个浏览器启动后的回调 on_start(worker)，可用于打开页面并确保登录，可选
+
+        Returns:
+            BrowserPool: 当前浏览器池
+        """
+        print(f"正在启动 {self.size} 个浏览器实例...")
+        workers = []
+        for index in range(self.size):
+            browser_manager = BrowserManager(
+                headless=self.headless,
+                driver_path=self.driver_path,
+                reuse_browser=self.reuse_browser,
+                debug_port=self.base_port + index,
+                profile_dir=os.path.join(self.profile_root, f"worker_{index}")
+            )
+            workers.append(BrowserWorker(index, browser_manager, self.session_store, self.fast_popups,
+                                         self.popup_observer))
+
+        def _start(worker):
+            worker.start()
+            if on_start:
+                on_start(worker)
+            return worker
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(_start, worker) for worker in workers]
+            for worker, future in zip(workers, futures):
+                try:
+                    future.result()
+                    self.workers.append(worker)
+                    self._idle.put(worker)
+                except Exception as e:
+                    print(f"浏览器 {worker.index} 启动失败: {e}")
+                    worker.close()
+
+        if not self.workers:
+            raise RuntimeError("没有可用的浏览器实例")
+        print(f"已启动 {len(self.workers)} 个浏览器实例")
+        return self
+
+    def acquire(self, timeout=None):
+        """
+        获取一个空闲的工作者
+
+        Args:
+            timeout: 等待超时时间（秒），None表示一直等待
+
+        Returns:
+            BrowserWorker: 空闲的工作者
+        """
+        return self._idle.get(timeout=timeout)
+
+    def release(self, worker):
+        """
+        归还工作者
+
+        Args:
+            worker: 之前获取的工作者
+        """
+        self._idle.put(worker)
+
+    def run(self, items, handler):
+        """
+        将任务分发给所有工作者并行处理，每个工作者同一时间只处理一个任务
+
+        Args:
+            items: 任务列表
+            handler: 处理函数 handler(worker, item)，返回值作为该任务的结果
+
+        Returns:
+            list: 与items顺序一致的结果列表，处理异常的任务结果为None
+        """
+        results = [None] * len(items)
+        task_queue = queue.Queue()
+        for index, item in enumerate(items):
+            task_queue.put((index, item))
+
+        def _consume():
+            worker = self.acquire()
+            try:
+                while True:
+                    try:
+                        index, item = task_queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        results[index] = handler(worker, item)
+                    except Exception as e:
+                        print(f"浏览器 {worker.index} 处理任务失败: {e}")
+            finally:
+                self.release(worker)
+
+        threads = [threading.Thread(target=_consume, daemon=True) for _ in self.workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def consume(self, task_queue, handler):
+        """
+        持续从队列领取任务并行处理，直到取到结束标记None，适用于边生产边发布的流水线
+
+        Args:
+            task_queue: 任务队列（queue.Queue），生产者放入None表示没有更多任务
+            handler: 处理函数 handler(worker, item)，返回值作为该任务的结果
+
+        Returns:
+            list: 按完成顺序排列的结果列表，处理异常的任务结果为None
+        """
+        results = []
+        results_lock = threading.Lock()
+
+        def _consume():
+            worker = self.acquire()
+            try:
+                while True:
+                    item = task_queue.get()
+                    if item is None:
+                        # 放回结束标记，让其他工作者也能退出
+                        task_queue.put(None)
+                        return
+                    try:
+                        result = handler(worker, item)
+                    except Exception as e:
+                        print(f"浏览器 {worker.index} 处理任务失败: {e}")
+                        result = None
+                    with results_lock:
+                        results.append(result)
+            finally:
+                self.release(worker)
+
+        threads = [threading.Thread(target=_consume, daemon=True) for _ in self.workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def close(self):
+        """关闭所有浏览器"""
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
+        self._idle = queue.Queue()
+
+    def __enter__(self):
+        """上下文管理器进入方法"""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出方法"""
+        self.close()
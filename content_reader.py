@@ -5,6 +5,111 @@
 """
 
 import openpyxl
+from generation_journal import GENERATION_STATUS_FALLBACK
+
+# Excel列的映射关系: A列标题、B列正文、C列图片路径、D列话题标签、E列分类、F列生成状态
+NOTE_COLUMNS = 6
+
+def split_list(value):
+    """
+    将分号分隔的单元格内容拆分为列表
+    
+    Args:
+        value: 单元格值
+    
+    Returns:
+        list: 去除空白后的非空项列表
+    """
+    if not value:
+        return []
+    return [item.strip() for item in str(value).split(';') if item.strip()]
+
+class NoteRecord:
+    """紧凑的笔记记录类，兼容按键读取的字典用法"""
+    
+    FIELDS = ('row', 'title', 'content', 'image_paths', 'tags', 'category', 'generation_status')
+    __slots__ = FIELDS
+    
+    def __init__(self, row, title='', content='', image_paths=None, tags=None, category='', generation_status=''):
+        """
+        初始化笔记记录
+        
+        Args:
+            row: Excel行号
+            title: 标题
+            content: 正文内容
+            image_paths: 图片路径列表
+            tags: 话题标签列表
+            category: 分类
+            generation_status: 生成状态，正文为模板兜底时为GENERATION_STATUS_FALLBACK
+        """
+        self.row = row
+        self.title = title
+        self.content = content
+        self.image_paths = image_paths or []
+        self.tags = tags or []
+        self.category = category
+        self.generation_status = generation_status
+    
+    @property
+    def is_fallback(self):
+        """正文是否为模板兜底内容"""
+        return self.generation_status == GENERATION_STATUS_FALLBACK
+    
+    @classmethod
+    def from_values(cls, row, values):
+        """
+        由一行单元格值构造笔记记录
+        
+        Args:
+            row: Excel行号
+            values: 该行A~F列的值，长度不足时视为空
+        
+        Returns:
+            NoteRecord: 笔记记录
+        """
+        values = tuple(values[:NOTE_COLUMNS]) + (None,) * (NOTE_COLUMNS - len(values))
+        title, content, image_paths, tags, category, generation_status = values
+        return cls(
+            row,
+            title=title or '',
+            content=content or '',
+            image_paths=split_list(image_paths),
+            tags=split_list(tags),
+            category=category or '',
+            generation_status=generation_status or ''
+        )
+    
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key, default=None):
+        """按键读取字段，兼容字典用法"""
+        if key not in self.FIELDS:
+            return default
+        return getattr(self, key)
+    
+    def to_dict(self):
+        """
+        转换为笔记数据字典
+        
+        Returns:
+            dict: 笔记数据
+        """
+        return {
+            'row': self.row,
+            'title': self.title,
+            'content': self.content,
+            'image_paths': self.image_paths,
+            'tags': self.tags,
+            'category': self.category,
+            'generation_status': self.generation_status
+        }
+    
+    def __repr__(self):
+        return f"NoteRecord(row={self.row}, title={self.title!r})"
 
 class ContentReader:
     """内容读取器类"""
@@ -52,30 +157,38 @@ class ContentReader:
             # C列: 图片路径（用分号分隔多个图片）
             # D列: 话题标签（用分号分隔多个标签）
             # E列: 分类
+            # F列: 生成状态
             
-            note_data = {
-                'title': self.sheet.cell(row=row_num, column=1).value or '',
-                'content': self.sheet.cell(row=row_num, column=2).value or '',
-                'image_paths': [],
-                'tags': [],
-                'category': self.sheet.cell(row=row_num, column=5).value or ''
-            }
-            
-            # 处理图片路径
-            image_paths_str = self.sheet.cell(row=row_num, column=3).value
-            if image_paths_str:
-                note_data['image_paths'] = [path.strip() for path in image_paths_str.split(';') if path.strip()]
-            
-            # 处理话题标签
-            tags_str = self.sheet.cell(row=row_num, column=4).value
-            if tags_str:
-                note_data['tags'] = [tag.strip() for tag in tags_str.split(';') if tag.strip()]
+            values = [self.sheet.cell(row=row_num, column=col).value for col in range(1, NOTE_COLUMNS + 1)]
+            note_data = NoteRecord.from_values(row_num, values).to_dict()
             
             return note_data
         except Exception as e:
             print(f"读取笔记数据失败: {e}")
             return {}
     
+    def iter_notes(self, min_row=2):
+        """
+        以只读流式方式逐行读取笔记，内存占用不随表格行数增长
+        
+        Args:
+            min_row: 起始行号，默认从第2行开始（第1行是表头）
+        
+        Yields:
+            NoteRecord: 笔记记录，跳过整行为空的行
+        """
+        workbook = openpyxl.load_workbook(self.file_path, read_only=True)
+        try:
+            sheet = workbook.active
+            for row_num, values in enumerate(
+                    sheet.iter_rows(min_row=min_row, max_col=NOTE_COLUMNS, values_only=True), start=min_row):
+                if not any(values):
+                    continue
+                yield NoteRecord.from_values(row_num, values)
+        finally:
+            # 只读模式会保持文件句柄，需要显式关闭
+            workbook.close()
+    
     def read_all_notes(self):
         """
         读取所有笔记数据
@@ -84,16 +197,7 @@ class ContentReader:
             list: 所有笔记数据的列表
         """
         try:
-            if not self.sheet:
-                self.open_workbook()
-            
-            notes = []
-            # 从第2行开始读取（假设第1行是表头）
-            for row in range(2, self.sheet.max_row + 1):
-                note_data = self.read_note_data(row)
-                if note_data:
-                    notes.append(note_data)
-            
+            notes = [note.to_dict() for note in self.iter_notes()]
             print(f"共读取到 {len(notes)} 条笔记数据")
             return notes
         except Exception as e:
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟的创作服务平台发布页，用于离线发布基准测试
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# 与 publisher.PUBLISH_BUTTON_SELECTOR 保持一致的发布按钮类名
+PUBLISH_BUTTON_CLASSES = ("d-button d-button-large --size-icon-large --size-text-h6 d-button-with-content "
+                          "--color-static bold --color-bg-fill --color-text-paragraph custom-button red publishBtn")
+
+_PUBLISH_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>发布笔记 - 本地模拟</title></head>
+<body>
+<div class="upload-area"><input class="upload-input" type="file" multiple accept="image/*"></div>
+<div class="img-upload-area"></div>
+<input class="title-input" type="text" placeholder="填写标题会有更多赞哦～">
+<div class="tiptap ProseMirror" contenteditable="true" role="textbox"></div>
+<button type="button" class="__BUTTON_CLASSES__" disabled>发布</button>
+<script>
+var UPLOAD_LATENCY = __UPLOAD_LATENCY__;
+var fileInput = document.querySelector('input.upload-input');
+var imageArea = document.querySelector('.img-upload-area');
+var titleInput = document.querySelector('input.title-input');
+var editor = document.querySelector('div.tiptap.ProseMirror');
+var button = document.querySelector('button.publishBtn');
+var pending = 0;
+function refresh() {
+    // 与真实页面一致：图片上传完成前发布按钮不可点击
+    button.disabled = pending > 0 || imageArea.children.length === 0;
+}
+fileInput.addEventListener('change', function () {
+    Array.prototype.forEach.call(fileInput.files, function () {
+        var item = document.createElement('div');
+        item.className = 'img-container';
+        var progress = document.createElement('div');
+        progress.className = 'uploading';
+        item.appendChild(progress);
+        imageArea.appendChild(item);
+        pending++;
+        setTimeout(function () {
+            item.removeChild(progress);
+            pending--;
+            refresh();
+        }, UPLOAD_LATENCY);
+    });
+    fileInput.value = '';
+    refresh();
+});
+button.addEventListener('click', function () {
+    button.disabled = true;
+    var note = {title: titleInput.value, content: editor.textContent, images: imageArea.children.length};
+    fetch('/api/publish', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(note)})
+        .then(function () { location.href = '/publish/success?published=true'; });
+});
+</script>
+</body>
+</html>
+"""
+
+_SUCCESS_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>发布成功 - 本地模拟</title></head>
+<body><div class="success-tip">发布成功</div></body>
+</html>
+"""
+
+class CreatorFixtureServer:
+    """模拟发布页服务类，在后台线程中提供发布页、发布接口和发布成功页"""
+
+    def __init__(self, host='127.0.0.1', port=0, page_latency=0.2, upload_latency=0.5, publish_latency=0.3):
+        """
+        初始化模拟发布页服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            page_latency: 发布页的模拟加载耗时（秒）
+            upload_latency: 每张图片的模拟上传耗时（秒），在页面内计时
+            publish_latency: 发布接口的模拟处理耗时（秒）
+        """
+        self.host = host
+        self.port = port
+        self.page_latency = page_latency
+        self.upload_latency = upload_latency
+        self.publish_latency = publish_latency
+        self.published = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """模拟服务的根地址"""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def publish_url(self):
+        """Publisher使用的发布页地址"""
+        return f"{self.base_url}/publish/publish?from=menu&target=image"
+
+    def _record_publish(self, note):
+        """记录一条已发布的笔记"""
+        with self._lock:
+            self.published.append(note)
+
+    def _render_publish_page(self):
+        """生成带有当前模拟耗时的发布页"""
+        return (_PUBLISH_PAGE
+                .replace('__BUTTON_CLASSES__', PUBLISH_BUTTON_CLASSES)
+                .replace('__UPLOAD_LATENCY__', str(int(self.upload_latency * 1000))))
+
+    def _build_handler(self):
+        """构造绑定到当前服务实例的请求处理类"""
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                # 关闭默认的访问日志输出
+                pass
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == '/publish/publish':
+                    time.sleep(server.page_latency)
+                    self._send(200, server._render_publish_page())
+                elif path == '/publish/success':
+                    self._send(200, _SUCCESS_PAGE)
+                else:
+                    self._send(404, "not found", 'text/plain')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length)
+                if urlparse(self.path).path != '/api/publish':
+                    self._send(404, "not found", 'text/plain')
+                    return
+                time.sleep(server.publish_latency)
+                server._record_publish(json.loads(body or b'{}'))
+                self._send(200, json.dumps({"success": True}), 'application/json')
+
+            def _send(self, status, text, content_type='text/html'):
+                data = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return _Handler
+
+    def start(self):
+        """在后台线程启动服务"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._build_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        """上下文管理器进入方法"""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出方法"""
+        self.stop()
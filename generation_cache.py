@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成结果缓存，负责将生成的内容按标题和提示参数持久化到SQLite
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+class GenerationCache:
+    """基于SQLite的生成结果缓存类"""
+
+    def __init__(self, db_path='generation_cache.db', max_entries=10000, max_age=30 * 24 * 3600):
+        """
+        初始化生成结果缓存
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_entries: 最多保留的缓存条数，超出时淘汰最久未访问的条目，None表示不限制
+            max_age: 缓存条目的最长保留时间（秒），None表示不过期
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 生成任务在线程池中并发执行，连接需要允许跨线程使用，由锁保证串行访问
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS generations ("
+            "key TEXT PRIMARY KEY, "
+            "content TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_accessed ON generations (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(title, model, system_prompt, temperature, max_tokens):
+        """
+        根据标题和提示参数生成缓存键
+
+        Args:
+            title: 标题
+            model: 模型名称
+            system_prompt: 系统提示词
+            temperature: 采样温度
+            max_tokens: 最大生成token数
+
+        Returns:
+            str: 内容寻址的缓存键（SHA-256）
+        """
+        payload = json.dumps([title, model, system_prompt, temperature, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            str: 缓存的内容，未命中或已过期时返回None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT content, created_at FROM generations WHERE key = ?", (key,)).fetchone()
+            if row and (self.max_age is None or now - row[1] <= self.max_age):
+                self._conn.execute("UPDATE generations SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, content):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            content: 生成的内容
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generations (key, content, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, content, now, now)
+            )
+            self._conn.commit()
+        self.evict()
+
+    def evict(self):
+        """按过期时间和条数上限淘汰缓存条目"""
+        with self._lock:
+            if self.max_age is not None:
+                self._conn.execute("DELETE FROM generations WHERE created_at < ?", (time.time() - self.max_age,))
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM generations WHERE key IN ("
+                    "SELECT key FROM generations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def stats(self):
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 命中数、未命中数、命中率和当前条目数
+        """
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM generations").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': size
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        """上下文管理器进入方法"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出方法"""
+        self.close()
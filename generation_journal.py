@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成日志，负责以追加方式记录已生成的行，用于崩溃后恢复
+"""
+
+import json
+import os
+import threading
+import time
+
+# 生成状态（Excel F列）：API重试用尽后使用模板兜底的正文，下次运行会重新生成，且不会被发布
+GENERATION_STATUS_FALLBACK = '模板兜底'
+
+class GenerationJournal:
+    """追加写入的JSON Lines生成日志类"""
+
+    def __init__(self, journal_path):
+        """
+        初始化生成日志
+
+        Args:
+            journal_path: 日志文件路径
+        """
+        self.journal_path = journal_path
+        self._file = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(excel_path):
+        """
+        获取Excel文件对应的旁路日志路径
+
+        Args:
+            excel_path: Excel文件路径
+
+        Returns:
+            str: 日志文件路径
+        """
+        return f"{excel_path}.journal.jsonl"
+
+    def append(self, row, title, content, fallback=False):
+        """
+        追加一条生成记录并立即落盘
+
+        Args:
+            row: 行号
+            title: 标题
+            content: 生成的内容
+            fallback: 内容是否为重试用尽后的模板兜底
+        """
+        record = {'row': row, 'title': title, 'content': content, 'time': time.time()}
+        if fallback:
+            record['fallback'] = True
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def replay(self):
+        """
+        回放日志中的生成记录
+
+        Returns:
+            dict: 行号到记录的映射，同一行以最后一条记录为准
+        """
+        entries = {}
+        if not os.path.exists(self.journal_path):
+            return entries
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 崩溃时最后一行可能只写了一半，忽略即可
+                    continue
+                entries[record['row']] = record
+        return entries
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """关闭并删除日志文件，在结果已合并进工作簿后调用"""
+        self.close()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片预处理器，负责在发布前并行缩放、压缩图片并去除元数据
+"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # 未安装Pillow时跳过预处理，直接上传原图
+    Image = None
+    ImageOps = None
+
+# 平台图片的有效最大边长（像素），超过后平台会再次压缩
+DEFAULT_MAX_EDGE = 1440
+DEFAULT_QUALITY = 85
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """
+    计算文件内容的SHA-256
+
+    Args:
+        path: 文件路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _preprocess_image(source_path, cache_dir, max_edge, quality):
+    """
+    处理单张图片，结果按源文件内容哈希缓存（在子进程中执行）
+
+    Args:
+        source_path: 源图片路径
+        cache_dir: 缓存目录
+        max_edge: 最大边长
+        quality: JPEG压缩质量
+
+    Returns:
+        tuple: (输出路径, 是否命中缓存)
+    """
+    key = f"{file_digest(source_path)}_{max_edge}_{quality}"
+    output_path = os.path.join(cache_dir, f"{key}.jpg")
+    if os.path.exists(output_path):
+        return output_path, True
+
+    with Image.open(source_path) as image:
+        # 先按EXIF方向旋转，再丢弃EXIF等元数据
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        # 先写临时文件再原子替换，避免并发处理同一内容时读到半个文件
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        image.save(temp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+    os.replace(temp_path, output_path)
+    return output_path, False
+
+class ImagePreprocessor:
+    """图片预处理器类，使用进程池并行处理，并按内容哈希缓存结果"""
+
+    def __init__(self, cache_dir='.image_cache', max_edge=DEFAULT_MAX_EDGE, quality=DEFAULT_QUALITY, workers=None):
+        """
+        初始化图片预处理器
+
+        Args:
+            cache_dir: 处理结果缓存目录
+            max_edge: 输出图片的最大边长（像素）
+            quality: JPEG压缩质量（1-95）
+            workers: 进程池大小，None表示使用CPU核数
+        """
+        self.cache_dir = cache_dir
+        self.max_edge = max_edge
+        self.quality = quality
+        self.workers = workers
+
+    def preprocess(self, image_paths):
+        """
+        预处理一批图片，相同路径只处理一次，不存在或处理失败的图片保留原路径
+
+        Args:
+            image_paths: 图片路径列表
+
+        Returns:
+            dict: 原路径到处理后路径的映射
+        """
+        unique_paths = [path for path in dict.fromkeys(image_paths) if os.path.isfile(path)]
+        mapping = {path: path for path in image_paths}
+        if not unique_paths:
+            return mapping
+        if Image is None:
+            print("未安装Pillow，跳过图片预处理，直接上传原图")
+            return mapping
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        source_bytes = 0
+        output_bytes = 0
+        cache_hits = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                path: executor.submit(_preprocess_image, path, self.cache_dir, self.max_edge, self.quality)
+                for path in unique_paths
+            }
+            for path, future in futures.items():
+                try:
+                    output_path, cached = future.result()
+                except Exception as e:
+                    print(f"预处理图片失败，使用原图: {path}: {e}")
+                    continue
+                mapping[path] = output_path
+                cache_hits += cached
+                source_bytes += os.path.getsize(path)
+                output_bytes += os.path.getsize(output_path)
+
+        print(f"已预处理 {len(unique_paths)} 张图片（缓存命中 {cache_hits} 张），"
+              f"上传体积 {source_bytes / 1024 / 1024:.1f}MB -> {output_bytes / 1024 / 1024:.1f}MB")
+        return mapping
+
+    def preprocess_notes(self, notes):
+        """
+        预处理所有笔记中的图片，并将笔记的图片路径替换为处理后的路径
+
+        Args:
+            notes: 笔记记录列表
+        """
+        all_paths = [path for note in notes for path in note.image_paths]
+        if not all_paths:
+            return
+        mapping = self.preprocess(all_paths)
+        for note in notes:
+            note.image_paths = [mapping.get(path, path) for path in note.image_paths]
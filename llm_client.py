@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM生成客户端，负责维护长连接的DeepSeek客户端并生成内容
+"""
+
+import json
+import threading
+import httpx
+from openai import OpenAI
+from generation_cache import GenerationCache
+
+# 默认生成参数
+DEFAULT_BASE_URL = "https://api.deepseek.com"
+DEFAULT_MODEL = "deepseek-reasoner"
+DEFAULT_SYSTEM_PROMPT = "你是一个小红书内容创作者，请根据给定标题生成一条简洁的小红书内容，不超过700个字符。内容要完整可读"
+DEFAULT_TEMPERATURE = 1.3
+DEFAULT_MAX_TOKENS = 1000
+DEFAULT_MAX_CONTENT_LENGTH = 700
+
+# 截断时优先在这些字符之后断开，保证内容以完整的句子结尾
+SENTENCE_ENDINGS = '。！？!?…\n'
+
+def trim_to_sentence(text, max_length, min_ratio=0.5):
+    """
+    将内容截断到max_length个字符以内，尽量在句子边界处断开
+
+    Args:
+        text: 原始内容
+        max_length: 最大字符数
+        min_ratio: 句子边界至少要保留的长度比例，边界过早时直接按字符截断
+
+    Returns:
+        str: 截断后的内容
+    """
+    text = text.strip()
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length]
+    boundary = max(cut.rfind(char) for char in SENTENCE_ENDINGS)
+    if boundary + 1 >= max_length * min_ratio:
+        cut = cut[:boundary + 1]
+    return cut.rstrip()
+
+# 批量生成时的系统提示词，要求模型按序号返回JSON，便于拆分回对应的行
+BATCH_SYSTEM_PROMPT = (
+    "你是一个小红书内容创作者。用户会以JSON给出多个标题，请为每个标题分别生成一条简洁的小红书内容，"
+    "每条不超过700个字符，内容要完整可读。只输出一个JSON对象，不要输出其他文字，格式为："
+    '{"items": [{"index": 标题序号, "content": "生成的内容"}]}'
+)
+
+def _strip_code_fence(text):
+    """去掉模型有时包在JSON外面的```代码块标记"""
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        if text.rstrip().endswith('```'):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+def parse_batch_response(text, count):
+    """
+    解析批量生成的JSON响应
+
+    Args:
+        text: 模型返回的文本
+        count: 本批标题数
+
+    Returns:
+        list: 与标题顺序一致的内容列表，缺失或格式错误的条目为None
+    """
+    contents = [None] * count
+    text = _strip_code_fence(text or '')
+    start, end = text.find('{'), text.rfind('}')
+    try:
+        data = json.loads(text[start:end + 1] if start != -1 and end > start else text)
+    except ValueError:
+        return contents
+
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return contents
+    for position, item in enumerate(items):
+        if isinstance(item, str):
+            # 模型直接返回字符串数组时按位置对应
+            index, content = position + 1, item
+        elif isinstance(item, dict):
+            index, content = item.get('index'), item.get('content')
+        else:
+            continue
+        try:
+            index = int(index)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= index <= count and isinstance(content, str) and content.strip() and contents[index - 1] is None:
+            contents[index - 1] = content
+    return contents
+
+class GenerationClient:
+    """长连接生成客户端类，内部复用同一个HTTP连接池"""
+
+    def __init__(self, api_key=None, base_url=DEFAULT_BASE_URL, model=DEFAULT_MODEL,
+                 system_prompt=DEFAULT_SYSTEM_PROMPT, temperature=DEFAULT_TEMPERATURE,
+                 max_tokens=DEFAULT_MAX_TOKENS, max_content_length=DEFAULT_MAX_CONTENT_LENGTH,
+                 connect_timeout=10.0, read_timeout=120.0, max_connections=20,
+                 max_keepalive_connections=10, keepalive_expiry=60.0, max_retries=2, cache=None, stream=False):
+        """
+        初始化生成客户端
+
+        Args:
+            api_key: DeepSeek API密钥
+            base_url: API地址
+            model: 模型名称
+            system_prompt: 系统提示词
+            temperature: 采样温度
+            max_tokens: 最大生成token数
+            max_content_length: 生成内容的最大字符数
+            connect_timeout: 建立连接的超时时间（秒）
+            read_timeout: 读取响应的超时时间（秒）
+            max_connections: 连接池最大连接数
+            max_keepalive_connections: 连接池保持的最大空闲长连接数
+            keepalive_expiry: 空闲长连接的保持时间（秒）
+            max_retries: OpenAI SDK内置的重试次数
+            cache: 生成结果缓存（GenerationCache），可选，命中时不再调用API
+            stream: 是否流式接收，默认False；开启后达到max_content_length立即停止接收，不再等待其余内容，
+                但提前断开的连接不能放回连接池，下次请求需要重新建立连接
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.system_prompt = system_prompt
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.max_content_length = max_content_length
+        self.max_retries = max_retries
+        self.cache = cache
+        self.stream = stream
+
+        # 所有请求共享同一个httpx连接池，避免每次调用都重新建立TCP/TLS连接
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=max_retries
+        )
+
+    def lookup(self, title):
+        """
+        查询标题在单条生成参数下的缓存
+
+        Args:
+            title: 标题
+
+        Returns:
+            str: 缓存的内容，未启用缓存或未命中时返回None
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(self.cache_key(title))
+
+    def lookup_batch(self, titles):
+        """
+        查询多个标题在批量生成参数下的缓存
+
+        Args:
+            titles: 标题列表
+
+        Returns:
+            list: 与titles顺序一致的缓存内容列表，未命中的条目为None
+        """
+        if self.cache is None:
+            return [None] * len(titles)
+        return [self.cache.get(self.batch_cache_key(title)) for title in titles]
+
+    def generate(self, title, use_cache=True):
+        """
+        根据标题生成内容，失败时抛出异常
+
+        Args:
+            title: 标题
+            use_cache: 是否先查询缓存，默认True；调用方已在重试循环外查询过缓存时传False，
+                避免每次重试都重复查询并计入未命中
+
+        Returns:
+            str: 生成的内容，不超过max_content_length个字符
+        """
+        if use_cache:
+            cached = self.lookup(title)
+            if cached is not None:
+                return cached
+
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": f"标题：{title}"}
+        ]
+        if self.stream:
+            content = self._generate_streaming(messages)
+        else:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature
+            )
+            content = response.choices[0].message.content or ''
+        content = trim_to_sentence(content, self.max_content_length)
+
+        if self.cache is not None and content:
+            self.cache.put(self.cache_key(title), content)
+        return content
+
+    def generate_batch(self, titles, use_cache=True):
+        """
+        在一次请求中为多个标题生成内容，整个请求失败时抛出异常
+
+        缓存命中的标题不再请求；响应格式错误或缺少某个标题时，该标题对应的内容为None，
+        由调用方单独重新生成。
+
+        Args:
+            titles: 标题列表
+            use_cache: 是否先查询缓存，默认True；调用方已在重试循环外查询过缓存时传False
+
+        Returns:
+            list: 与titles顺序一致的内容列表，缺失的条目为None
+        """
+        contents = self.lookup_batch(titles) if use_cache else [None] * len(titles)
+
+        missing = [position for position, content in enumerate(contents) if content is None]
+        if not missing:
+            return contents
+
+        payload = {"titles": [{"index": number, "title": titles[position]}
+                              for number, position in enumerate(missing, 1)]}
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+            ],
+            # 每个标题保留与单条生成相同的token预算
+            max_tokens=self.max_tokens * len(missing),
+            temperature=self.temperature
+        )
+        parsed = parse_batch_response(response.choices[0].message.content, len(missing))
+
+        for position, content in zip(missing, parsed):
+            if content is None:
+                continue
+            content = trim_to_sentence(content, self.max_content_length)
+            contents[position] = content or None
+            # 按批量提示词计算的缓存键保存，不会作为单条生成的结果返回
+            if self.cache is not None and content:
+                self.cache.put(self.batch_cache_key(titles[position]), content)
+        return contents
+
+    def _generate_streaming(self, messages):
+        """
+        流式接收生成内容，累计字符数达到上限后立即断开
+
+        正常结束时读完整个响应，连接放回连接池复用；只有达到上限提前断开时才关闭响应，
+        该连接随之丢弃，以多一次建连换取不再等待剩余内容
+
+        Args:
+            messages: 对话消息列表
+
+        Returns:
+            str: 已接收的内容（可能超过上限，由调用方按句子边界截断）
+        """
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            stream=True
+        )
+        parts = []
+        length = 0
+        finished = False
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                # 推理模型的思考过程在reasoning_content中，只累计正文
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                length += len(delta)
+                if length >= self.max_content_length:
+                    break
+            else:
+                finished = True
+        finally:
+            if not finished:
+                # 达到上限或出错时提前关闭响应，服务端停止继续输出
+                stream.close()
+        return ''.join(parts)
+
+    def cache_key(self, title):
+        """
+        计算标题在当前生成参数下的缓存键
+
+        Args:
+            title: 标题
+
+        Returns:
+            str: 缓存键
+        """
+        return GenerationCache.make_key(title, self.model, self.system_prompt, self.temperature, self.max_tokens)
+
+    def batch_cache_key(self, title):
+        """
+        计算标题在批量生成参数下的缓存键，与单条生成的缓存键互不相同
+
+        Args:
+            title: 标题
+
+        Returns:
+            str: 缓存键（由批量提示词和每个标题的token预算计算）
+        """
+        return GenerationCache.make_key(title, self.model, BATCH_SYSTEM_PROMPT, self.temperature, self.max_tokens)
+
+    def close(self):
+        """关闭连接池"""
+        if self.http_client:
+            self.http_client.close()
+            self.http_client = None
+
+    def __enter__(self):
+        """上下文管理器进入方法"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出方法"""
+        self.close()
+
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+def get_client(api_key=None, base_url=DEFAULT_BASE_URL, **kwargs):
+    """
+    获取共享的生成客户端，api_key、base_url和其他参数都相同时复用同一个实例
+
+    参数不同（如cache、stream、max_retries）时创建新的实例，不会返回忽略了这些参数的已有实例。
+
+    Args:
+        api_key: DeepSeek API密钥
+        base_url: API地址
+        **kwargs: 传给GenerationClient的其他参数，参与实例的区分
+
+    Returns:
+        GenerationClient: 共享的生成客户端
+    """
+    key = (api_key, base_url, tuple(sorted(kwargs.items())))
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None or client.http_client is None:
+            client = GenerationClient(api_key=api_key, base_url=base_url, **kwargs)
+            _shared_clients[key] = client
+        return client
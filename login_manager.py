@@ -4,14 +4,31 @@
 登录管理器，负责登录相关功能
 """
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 import time
+from selector_registry import get_default_registry
+from timing import get_default_recorder
+
+CREATOR_URL = "https://creator.xiaohongshu.com/"
+
+# 不刷新页面的登录状态探测脚本：页面已加载、位于创作者平台、且没有登录表单
+_LOGIN_PROBE_SCRIPT = """
+var url = location.href;
+var onCreator = url.indexOf('creator.xiaohongshu.com') !== -1;
+var hasLoginForm = !!document.querySelector("input[placeholder='手机号'], input[placeholder='验证码']");
+return {
+    ready: document.readyState === 'complete',
+    loggedIn: onCreator && url.indexOf('login') === -1 && !hasLoginForm,
+    loginPage: url.indexOf('login') !== -1 || hasLoginForm
+};
+"""
 
 class LoginManager:
     """登录管理器类"""
     
-    def __init__(self, driver, wait, popup_handler):
+    def __init__(self, driver, wait, popup_handler, session_store=None, probe_ttl=30, settle_timeout=5, spans=None,
+                 selectors=None, element_timeout=10):
         """
         初始化登录管理器
         
@@ -19,10 +36,48 @@ class LoginManager:
             driver: 浏览器驱动
             wait: 显式等待对象
             popup_handler: 弹窗处理器
+            session_store: 登录会话存储（SessionStore），可选，登录成功后保存快照，打开页面前恢复快照
+            probe_ttl: 登录状态探测结果的缓存时间（秒）
+            settle_timeout: 页面跳转未完成时等待登录状态明确的上限（秒）
+            spans: 阶段耗时记录器（SpanRecorder），可选，默认使用共享的记录器
+            selectors: 选择器注册表（SelectorRegistry），可选，默认使用共享的注册表
+            element_timeout: 等待登录表单元素的上限（秒），同一元素的所有候选选择器共用
         """
         self.driver = driver
         self.wait = wait
         self.popup_handler = popup_handler
+        self.session_store = session_store
+        self.probe_ttl = probe_ttl
+        self.settle_timeout = settle_timeout
+        self._login_state = None  # (是否已登录, 探测时间)
+        self.spans = spans
+        self.selectors = selectors or get_default_registry()
+        self.element_timeout = element_timeout
+    
+    def _span(self, name, **attrs):
+        """
+        记录一个登录阶段的耗时
+        
+        Args:
+            name: 阶段名
+            **attrs: 附加字段
+        
+        Returns:
+            上下文管理器
+        """
+        return (self.spans or get_default_recorder()).span(name, **attrs)
+    
+    def _find(self, name):
+        """
+        等待登录表单元素出现，同时探测配置中的所有候选选择器
+        
+        Args:
+            name: 选择器注册表中的元素名
+        
+        Returns:
+            WebElement: 找到的元素，超时抛出TimeoutException
+        """
+        return self.selectors.find(self.driver, name, self.element_timeout)
     
     def open_xiaohongshu(self, is_creator=False):
         """
@@ -32,12 +87,38 @@ class LoginManager:
             is_creator: 是否打开创作服务平台（默认False，此处仅用于兼容接口）
         """
         # 只打开创作者服务平台
-        url = "https://creator.xiaohongshu.com/"
+        url = CREATOR_URL
+        snapshot = self.session_store.load() if self.session_store else None
+        if snapshot:
+            # 在打开页面前写入Cookie，首次加载即带上登录态
+            try:
+                self.session_store.restore_cookies(self.driver, snapshot)
+            except Exception as e:
+                print(f"恢复登录Cookie失败: {e}")
+                snapshot = None
         print(f"正在打开小红书创作服务平台: {url}")
         self.driver.get(url)
+        self.invalidate_login_state()
+        if snapshot:
+            try:
+                self.session_store.restore_storage(self.driver, snapshot)
+            except Exception as e:
+                print(f"恢复本地存储失败: {e}")
         # 处理弹窗
         self.popup_handler.handle_popups()
     
+    def restore_session(self):
+        """
+        重新读取会话快照并恢复到当前浏览器（例如其他浏览器刚刚登录成功后）
+        
+        Returns:
+            bool: 恢复后是否已登录
+        """
+        if not self.session_store or not self.session_store.load():
+            return False
+        self.open_xiaohongshu(is_creator=True)
+        return self._check_login_status()
+    
     def login(self, phone_number=None, password=None, is_creator=False, use_verification_code=True):
         """
         登录小红书创作者服务平台
@@ -59,137 +140,128 @@ class LoginManager:
             if phone_number is None:
                 phone_number = "188********"
             
-            # 输入手机号 - 使用更通用的定位方式
-            try:
-                phone_input = None
-                # 尝试1: 精确CSS选择器
+            with self._span('login.phone') as phase:
+                # 输入手机号，候选选择器见selectors.json
                 try:
-                    phone_input = self.wait.until(EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "input[placeholder='手机号'].css-19z0sa3.css-nt440g.dyn")
-                    ))
-                except:
-                    # 尝试2: 仅使用placeholder
-                    phone_input = self.wait.until(EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "input[placeholder='手机号']")
-                    ))
-                
-                phone_input.clear()
-                # 输入手机号
-                for char in phone_number:
-                    phone_input.send_keys(char)
-                    time.sleep(0.1)  # 模拟人工输入
-                print(f"已输入手机号: {phone_number}")
-            except Exception as e:
-                print(f"输入手机号失败: {e}")
-                return False
+                    phone_input = self._find('login.phone_input')
+                    phone_input.clear()
+                    # 输入手机号
+                    for char in phone_number:
+                        phone_input.send_keys(char)
+                        time.sleep(0.1)  # 模拟人工输入
+                    print(f"已输入手机号: {phone_number}")
+                except Exception as e:
+                    print(f"输入手机号失败: {e}")
+                    phase['ok'] = False
+                    return False
             
-            # 点击发送验证码按钮 - 使用多种定位方式
-            try:
-                send_code_button = None
-                # 尝试1: 原始XPATH
+            with self._span('login.send_code') as phase:
+                # 点击发送验证码按钮
                 try:
-                    send_code_button = self.wait.until(EC.element_to_be_clickable(
-                        (By.XPATH, "//div[contains(@class, 'css-1vfl29') and text()='发送验证码']")
-                    ))
-                except:
-                    # 尝试2: 仅使用文本
-                    try:
-                        send_code_button = self.wait.until(EC.element_to_be_clickable(
-                            (By.XPATH, "//*[contains(text(), '发送验证码')]")))
-                    except:
-                        # 尝试3: CSS选择器
-                        send_code_button = self.wait.until(EC.element_to_be_clickable(
-                            (By.CSS_SELECTOR, ".send-code-btn")))
-                
-                send_code_button.click()
-                print("已点击发送验证码按钮")
-                # 等待验证码发送成功（可能需要处理弹窗）
-                self.popup_handler.handle_popups()
-            except Exception as e:
-                print(f"点击发送验证码按钮失败: {e}")
-                return False
+                    send_code_button = self._find('login.send_code_button')
+                    send_code_button.click()
+                    print("已点击发送验证码按钮")
+                    # 等待验证码发送成功（可能需要处理弹窗）
+                    self.popup_handler.handle_popups()
+                except Exception as e:
+                    print(f"点击发送验证码按钮失败: {e}")
+                    phase['ok'] = False
+                    return False
             
-            # 等待用户输入验证码
-            code = input("请输入收到的验证码: ").strip()
+            with self._span('login.code_wait'):
+                # 等待用户输入验证码
+                code = input("请输入收到的验证码: ").strip()
             
-            # 输入验证码 - 使用更通用的定位方式
-            try:
-                code_input = None
-                # 尝试1: 精确CSS选择器（原始）
+            with self._span('login.code_entry') as phase:
+                # 输入验证码
                 try:
-                    code_input = self.wait.until(EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "input[placeholder='验证码'].css-19z0sa3.css-1ge5flv.dyn")
-                    ))
-                except:
-                    # 尝试2: 另一精确CSS选择器
-                    try:
-                        code_input = self.wait.until(EC.presence_of_element_located(
-                            (By.CSS_SELECTOR, "input[placeholder='验证码'].css-19z0sa3.css-nt440g.dyn")
-                        ))
-                    except:
-                        # 尝试3: 仅使用placeholder
-                        code_input = self.wait.until(EC.presence_of_element_located(
-                            (By.CSS_SELECTOR, "input[placeholder='验证码']")
-                        ))
-                
-                code_input.clear()
-                code_input.send_keys(code)
-                print("已输入验证码")
-            except Exception as e:
-                print(f"输入验证码失败: {e}")
-                return False
+                    code_input = self._find('login.code_input')
+                    code_input.clear()
+                    code_input.send_keys(code)
+                    print("已输入验证码")
+                except Exception as e:
+                    print(f"输入验证码失败: {e}")
+                    phase['ok'] = False
+                    return False
             
-            # 点击登录按钮 - 使用更通用的定位方式
-            try:
-                login_confirm_button = None
-                # 尝试1: 原始精确CSS选择器
+            with self._span('login.confirm') as phase:
+                # 点击登录按钮
                 try:
-                    login_confirm_button = self.wait.until(EC.element_to_be_clickable(
-                        (By.CSS_SELECTOR, "button.css-1jgt0wa.css-y4h4ay.dyn.beer-login-btn")
-                    ))
-                except:
-                    # 尝试2: 提交按钮type
-                    try:
-                        login_confirm_button = self.wait.until(EC.element_to_be_clickable(
-                            (By.CSS_SELECTOR, "button[type='submit']")
-                        ))
-                    except:
-                        # 尝试3: 精确CSS选择器备选
-                        try:
-                            login_confirm_button = self.wait.until(EC.element_to_be_clickable(
-                                (By.CSS_SELECTOR, "button.css-1525zvt.css-q63c9r.dyn")
-                            ))
-                        except:
-                            # 尝试4: 原始XPATH定位
-                            login_confirm_button = self.wait.until(EC.element_to_be_clickable(
-                                (By.XPATH, "//button[.//span[contains(text(), '登录')]]")
-                            ))
-                
-                login_confirm_button.click()
-                print("已点击登录确认按钮")
-                # 等待页面加载
-                time.sleep(2)
-            except Exception as e:
-                print(f"点击登录确认按钮失败: {e}")
-                return False
-            
-            # 处理弹窗
-            self.popup_handler.handle_popups()
-            
-            # 等待页面加载，检查登录状态
-            time.sleep(5)
+                    login_confirm_button = self._find('login.confirm_button')
+                    login_confirm_button.click()
+                    print("已点击登录确认按钮")
+                    # 等待页面加载
+                    time.sleep(2)
+                except Exception as e:
+                    print(f"点击登录确认按钮失败: {e}")
+                    phase['ok'] = False
+                    return False
             
-            # 检查登录是否成功
-            if self._check_login_status():
-                print("登录成功！")
-                return True
-            else:
-                print("登录失败！")
-                return False
+            with self._span('login.verify') as verify_span:
+                # 处理弹窗
+                self.popup_handler.handle_popups()
+                
+                # 等待页面加载，检查登录状态
+                time.sleep(5)
+                
+                # 检查登录是否成功
+                self.invalidate_login_state()
+                if self._check_login_status():
+                    print("登录成功！")
+                    self._save_session()
+                    return True
+                else:
+                    print("登录失败！")
+                    verify_span['ok'] = False
+                    return False
         except Exception as e:
             print(f"登录过程中发生错误: {e}")
             return False
     
+    def _save_session(self):
+        """登录成功后保存会话快照，供新的浏览器实例复用"""
+        if not self.session_store:
+            return
+        try:
+            self.session_store.save(self.driver)
+        except Exception as e:
+            print(f"保存登录会话快照失败: {e}")
+    
+    def invalidate_login_state(self):
+        """清除缓存的登录状态，页面跳转或登录后调用"""
+        self._login_state = None
+    
+    def probe_login_status(self):
+        """
+        不刷新页面的登录状态探测，结果在probe_ttl秒内缓存
+        
+        Returns:
+            dict: 探测结果，包含ready/loggedIn/loginPage字段
+        """
+        now = time.time()
+        if self._login_state and now - self._login_state[1] <= self.probe_ttl:
+            return self._login_state[0]
+        state = self.driver.execute_script(_LOGIN_PROBE_SCRIPT)
+        # 页面未加载完成时的结果不可靠，不缓存
+        if state.get('ready') and (state.get('loggedIn') or state.get('loginPage')):
+            self._login_state = (state, now)
+        return state
+    
+    def _settled_login_state(self, driver=None):
+        """
+        获取已明确的登录状态
+        
+        Args:
+            driver: 浏览器驱动（由WebDriverWait传入，可选）
+        
+        Returns:
+            dict: 页面加载完成且能判断是否登录时返回探测结果，否则返回None
+        """
+        state = self.probe_login_status()
+        if state.get('ready') and (state.get('loggedIn') or state.get('loginPage')):
+            return state
+        return None
+    
     def _check_login_status(self):
         """
         检查登录状态
@@ -198,24 +270,19 @@ class LoginManager:
             bool: 登录是否成功
         """
         try:
-            # 创作者服务平台登录状态检查
-            current_url = self.driver.current_url
-            print(f"当前URL: {current_url}")
-            
-            # 检查是否在创作者服务平台
-            if "creator.xiaohongshu.com" in current_url:
-                # 检查是否已登录（如果URL包含dashboard或没有login相关内容）
-                if "login" not in current_url:
-                    return True
-            
-            # 尝试刷新页面，再次检查
-            self.driver.refresh()
-            time.sleep(3)
-            current_url = self.driver.current_url
-            if "creator.xiaohongshu.com" in current_url and ("login" not in current_url):
-                return True
+            state = self._settled_login_state()
+            if state is None:
+                # 页面仍在加载或跳转，等待状态明确，而不是刷新页面
+                try:
+                    state = WebDriverWait(self.driver, self.settle_timeout, poll_frequency=0.2).until(
+                        self._settled_login_state
+                    )
+                except TimeoutException:
+                    print("等待登录状态明确超时")
+                    return False
             
-            return False
+            print(f"当前URL: {self.driver.current_url}")
+            return bool(state.get('loggedIn'))
         except Exception as e:
             print(f"检查登录状态失败: {e}")
             return False
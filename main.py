@@ -4,94 +4,374 @@
 小红书PC端自动化脚本主程序
 """
 
-from browser_manager import BrowserManager
-from popup_handler import PopupHandler
-from login_manager import LoginManager
-from publisher import Publisher
-from content_reader import ContentReader
+# selenium、openai、openpyxl等较重的依赖在各自的代码路径中按需导入，
+# 只生成内容或没有待发布笔记时不会加载浏览器相关模块
 import argparse
 import traceback
-import openpyxl
-from openai import OpenAI
+import time
+import threading
+import queue
+from generation_cache import GenerationCache
+from generation_journal import GENERATION_STATUS_FALLBACK
+from session_store import SessionStore
+from timing import get_default_recorder, configure_default_recorder
+from publish_ledger import PublishLedger, STATUS_PUBLISHED, STATUS_FAILED
+from note_compiler import NoteCompiler, CompileReport
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import os
 
-def generate_content(title, api_key=None):
+def fallback_content(title):
+    """
+    生成失败时使用的模板兜底内容
+    
+    Args:
+        title: 标题
+    
+    Returns:
+        str: 模板内容
+    """
+    return f"这是关于{title}的内容，简洁明了，适合快速阅读。"
+
+def generate_content_with_status(title, api_key=None, client=None, controller=None):
+    """
+    使用DeepSeek API实时生成内容，并返回内容是否为模板兜底
+    
+    Args:
+        title: 标题
+        api_key: DeepSeek API密钥，可选，默认从环境变量获取
+        client: 生成客户端，可选，默认使用按api_key共享的长连接客户端
+        controller: 生成调用控制器（GenerationController），可选，提供时按其并发限制和重试策略调用
+    
+    Returns:
+        tuple: (生成的内容, 是否为模板兜底)
+    """
+    try:
+        # 复用长连接客户端，避免每个标题都重新建立连接
+        if client is None:
+            from llm_client import get_client
+            client = get_client(api_key)
+        if controller is None:
+            return client.generate(title), False
+        # 缓存只在重试循环外查询一次，重试不会重复计入未命中
+        cached = client.lookup(title)
+        if cached is not None:
+            return cached, False
+        return controller.call(client.generate, title, use_cache=False), False
+    except Exception as e:
+        # 重试次数用尽后才使用模板兜底
+        print(f"生成内容失败，使用模板兜底：{e}")
+        return fallback_content(title), True
+
+def generate_content(title, api_key=None, client=None, controller=None):
     """
     使用DeepSeek API实时生成内容
     
     Args:
         title: 标题
         api_key: DeepSeek API密钥，可选，默认从环境变量获取
+        client: 生成客户端，可选，默认使用按api_key共享的长连接客户端
+        controller: 生成调用控制器（GenerationController），可选
+    
+    Returns:
+        str: 生成的内容，限制在700字符以内
+    """
+    return generate_content_with_status(title, api_key, client, controller)[0]
+
+def generate_batch_with_status(titles, api_key=None, client=None, controller=None):
+    """
+    在一次请求中为多个标题生成内容，并返回每个标题的内容是否为模板兜底
+    
+    批量响应格式错误或缺少某个标题时，只有这些标题单独重新生成；
+    整个批量请求在重试用尽后仍失败时，本批标题全部使用模板兜底。
+    
+    Args:
+        titles: 标题列表
+        api_key: DeepSeek API密钥，可选
+        client: 生成客户端，可选，默认使用按api_key共享的长连接客户端
+        controller: 生成调用控制器（GenerationController），可选
     
     Returns:
-        str: 生成的内容，限制在70字符以内
+        list: 与titles顺序一致的 (生成的内容, 是否为模板兜底) 列表
     """
+    if client is None:
+        from llm_client import get_client
+        client = get_client(api_key)
+    contents = [None] * len(titles)
     try:
-        # 初始化DeepSeek客户端
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.deepseek.com"
-        )
-        
-        # 调用DeepSeek API生成内容
-        response = client.chat.completions.create(
-            model="deepseek-reasoner",
-            messages=[
-                {"role": "system", "content": "你是一个小红书内容创作者，请根据给定标题生成一条简洁的小红书内容，不超过700个字符。内容要完整可读"},
-                {"role": "user", "content": f"标题：{title}"}
-            ],
-            max_tokens=1000,
-            temperature=1.3
-        )
-        
-        # 获取生成的内容
-        content = response.choices[0].message.content.strip()
-        
-        # 确保内容不超过70字符
-        if len(content) > 700:
-            content = content[:700]
-        
-        return content
+        if controller is None:
+            contents = client.generate_batch(titles)
+        else:
+            # 缓存只在重试循环外查询一次，只有未命中的标题进入重试的请求
+            contents = client.lookup_batch(titles)
+            missing = [position for position, content in enumerate(contents) if content is None]
+            if missing:
+                generated = controller.call(client.generate_batch, [titles[position] for position in missing],
+                                            use_cache=False)
+                for position, content in zip(missing, generated):
+                    contents[position] = content
     except Exception as e:
-        print(f"生成内容失败：{e}")
-        return f"这是关于{title}的内容，简洁明了，适合快速阅读。"
+        print(f"批量生成{len(titles)}个标题失败，使用模板兜底：{e}")
+        return [(content, False) if content is not None else (fallback_content(title), True)
+                for title, content in zip(titles, contents)]
+    
+    missing = [title for title, content in zip(titles, contents) if content is None]
+    if missing:
+        print(f"批量响应中缺少{len(missing)}个标题的内容，逐个重新生成")
+    return [(content, False) if content is not None
+            else generate_content_with_status(title, api_key, client, controller)
+            for title, content in zip(titles, contents)]
+
+def generate_rows(rows, api_key=None, concurrency=1, client=None, on_result=None, max_pending=None, controller=None,
+                  batch_size=1, stop_event=None):
+    """
+    使用线程池并发为多行标题生成内容
+    
+    Args:
+        rows: (行号, 标题) 元组列表
+        api_key: DeepSeek API密钥，可选
+        concurrency: 最大并发请求数，默认1（顺序生成）
+        client: 生成客户端，可选，所有行共享同一个客户端
+        on_result: 每行生成完成后的回调 on_result(行号, 标题, 内容, 是否为模板兜底)，可选，在调用线程中执行
+        max_pending: 已提交但回调尚未处理完的最大行数，可选，默认一次提交全部；
+            回调阻塞时不再提交新的行，用于流水线模式的背压
+        controller: 生成调用控制器（GenerationController），可选，默认以concurrency为上限，
+            限流时自动降低并发并带抖动重试；客户端已开启SDK内置重试时默认控制器不再重试
+        batch_size: 每个请求包含的标题数，默认1（逐个标题请求）；大于1时多个标题共用一次请求，
+            减少请求次数，但一次失败影响的行数也更多
+        stop_event: 停止事件（threading.Event），可选；设置后不再提交新的行并取消尚未开始的请求，
+            只等待正在进行的请求完成，未生成的行内容为None
+    
+    Returns:
+        list: 按行号升序排列的 (行号, 生成内容) 列表，生成失败的行内容为None
+    """
+    from adaptive_concurrency import AdaptiveLimiter, RetryPolicy, GenerationController
+    
+    concurrency = max(1, int(concurrency))
+    if client is None:
+        from llm_client import get_client
+        client = get_client(api_key)
+    if controller is None:
+        # 只保留一层重试：SDK已经重试时控制器每个请求只调用一次，否则重试次数会相乘
+        retry_policy = RetryPolicy(max_attempts=1) if getattr(client, 'max_retries', 0) else None
+        controller = GenerationController(AdaptiveLimiter(initial=concurrency, max_limit=concurrency), retry_policy)
+    results = {}
+    fallbacks = {}
+    
+    batch_size = max(1, int(batch_size or 1))
+    batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+    
+    def _generate(batch):
+        for _, title in batch:
+            print(f"处理标题：{title}")
+        if len(batch) == 1:
+            return [generate_content_with_status(batch[0][1], api_key, client, controller)]
+        return generate_batch_with_status([title for _, title in batch], api_key, client, controller)
+    
+    # 线程数取并发上限，实际同时进行的调用数由控制器动态限制
+    workers = controller.limiter.max_limit
+    max_pending = max(workers, -(-(max_pending or len(rows)) // batch_size))
+    remaining = iter(batches)
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+    stopped = False
+    try:
+        while True:
+            if stop_event is not None and stop_event.is_set() and not stopped:
+                # 调用方要求停止：不再提交新的行，取消尚未开始的请求
+                stopped = True
+                remaining = iter(())
+                cancelled = sum(1 for future in futures if future.cancel())
+                print(f"已停止生成，取消 {cancelled} 个尚未开始的请求，等待进行中的请求完成")
+            # 补充提交，保持已提交未处理的请求数不超过max_pending
+            for batch in remaining:
+                futures[executor.submit(_generate, batch)] = batch
+                if len(futures) >= max_pending:
+                    break
+            if not futures:
+                break
+            # 带超时等待，以便及时响应停止事件
+            done, _ = wait(futures, timeout=0.5 if stop_event is not None else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = futures.pop(future)
+                if future.cancelled():
+                    continue
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    # 单个请求失败不影响整批任务
+                    print(f"第{'、'.join(str(row) for row, _ in batch)}行生成内容失败：{e}")
+                    outcomes = [(None, False)] * len(batch)
+                for (row, title), (content, fallback) in zip(batch, outcomes):
+                    results[row], fallbacks[row] = content, fallback
+                    if on_result and content:
+                        on_result(row, title, content, fallback)
+    finally:
+        # 中断时取消尚未开始的任务，已完成的行已通过回调记录
+        executor.shutdown(wait=True, cancel_futures=True)
+    
+    stats = controller.stats()
+    print(f"生成调用 {stats['calls']} 次，重试 {stats['retries']} 次，限流/超时 {stats['overloads']} 次，"
+          f"当前并发数 {stats['limit']}（上调 {stats['increases']} 次，下调 {stats['decreases']} 次）")
+    fallback_count = sum(1 for fallback in fallbacks.values() if fallback)
+    if fallback_count:
+        print(f"有 {fallback_count} 行生成失败（重试用尽或错误不可重试），已使用模板兜底并标记，下次运行会重新生成")
+    return [(row, results.get(row)) for row, _ in sorted(rows)]
+
+def generate_missing(pipeline, api_key=None, concurrency=1, client=None, controller=None, batch_size=1):
+    """
+    为流水线中正文为空的行生成内容，结果保存在内存中并追加到生成日志
+    
+    Args:
+        pipeline: 已加载的工作簿流水线（WorkbookPipeline）
+        api_key: DeepSeek API密钥，可选
+        concurrency: 并发生成的最大请求数，默认1（逐行生成）
+        client: 生成客户端，可选，默认使用共享的长连接客户端
+        controller: 生成调用控制器（GenerationController），可选，提供时concurrency不再生效
+        batch_size: 每个请求包含的标题数，默认1
+    """
+    pending_rows = pipeline.pending_rows()
+    if not pending_rows:
+        print("没有需要生成内容的行")
+        return
+    if client is None:
+        from llm_client import get_client
+        client = get_client(api_key)
+    
+    if controller is None:
+        print(f"共有 {len(pending_rows)} 行需要生成内容，并发数：{max(1, int(concurrency))}")
+    else:
+        print(f"共有 {len(pending_rows)} 行需要生成内容，初始并发数：{controller.limiter.limit}，"
+              f"并发上限：{controller.limiter.max_limit}")
+    
+    def _on_result(row, title, content, fallback):
+        # 每行完成后立即记录，崩溃时可从日志恢复
+        pipeline.set_content(row, content, fallback=fallback)
+        print(f"第{row}行生成内容{'（模板兜底）' if fallback else ''}：{content}")
+    
+    generate_rows(pending_rows, api_key, concurrency, client, on_result=_on_result, controller=controller,
+                  batch_size=batch_size)
+    
+    if client.cache is not None:
+        stats = client.cache.stats()
+        print(f"生成缓存命中 {stats['hits']} 次，未命中 {stats['misses']} 次，当前缓存 {stats['entries']} 条")
 
-def process_excel(file_path, api_key=None):
+def process_excel(file_path, api_key=None, concurrency=1, client=None, resume=True, controller=None, batch_size=1):
     """
     处理Excel文件，生成内容
     
+    生成结果先逐行追加到旁路日志（<Excel文件>.journal.jsonl），全部完成后再一次性写入工作簿。
+    中途崩溃或中断时，下次运行会回放日志并跳过已生成的行。
+    
     Args:
         file_path: Excel文件路径
         api_key: DeepSeek API密钥，可选，默认从环境变量获取
+        concurrency: 并发生成的最大请求数，默认1（逐行生成）
+        client: 生成客户端，可选，默认使用共享的长连接客户端
+        resume: 是否回放上次未合并的生成日志，默认True；为False时丢弃旧日志重新生成
+        controller: 生成调用控制器（GenerationController），可选，提供时按其自适应并发和重试策略调用
+        batch_size: 每个请求包含的标题数，默认1（逐个标题请求）
+    
+    Returns:
+        list: 生成后的笔记记录列表
+    """
+    from pipeline import WorkbookPipeline
+    
+    pipeline = WorkbookPipeline(file_path, resume=resume).load()
+    try:
+        generate_missing(pipeline, api_key, concurrency, client, controller, batch_size)
+        pipeline.flush()
+        print(f"处理完成，已保存到{file_path}")
+        return pipeline.notes
+    finally:
+        pipeline.close()
+
+def select_notes_to_publish(notes, ledger=None, limit=None):
     """
-    # 打开Excel文件
-    wb = openpyxl.load_workbook(file_path)
-    sheet = wb.active
+    筛选需要发布的笔记，跳过没有标题/正文的行、模板兜底的行和台账中已发布成功的笔记
     
-    # 获取最大行数
-    max_row = sheet.max_row
+    Args:
+        notes: 笔记记录列表
+        ledger: 发布台账（PublishLedger），可选
+        limit: 最多选取的笔记数，None表示全部
     
-    # 从第2行开始处理（第1行是表头）
-    for row in range(2, max_row + 1):
-        title = sheet.cell(row=row, column=1).value
-        content = sheet.cell(row=row, column=2).value
+    Returns:
+        tuple: (待发布的笔记列表, 跳过的笔记数)
+    """
+    to_publish = []
+    skipped = 0
+    for note_data in notes:
+        if limit is not None and len(to_publish) >= limit:
+            break
         
-        # 如果标题存在且内容不存在或为空，则生成内容
-        if title and not content:
-            print(f"处理标题：{title}")
-            generated_content = generate_content(title, api_key)
-            if generated_content:
-                sheet.cell(row=row, column=2).value = generated_content
-                print(f"生成内容：{generated_content}")
-    
-    # 保存文件
-    wb.save(file_path)
-    wb.close()
-    print(f"处理完成，已保存到{file_path}")
+        # 没有标题或正文的行不发布
+        if not note_data.get('title') or not note_data.get('content'):
+            skipped += 1
+            continue
+        # 模板兜底的正文不发布，等待下次运行重新生成
+        if note_data.get('generation_status') == GENERATION_STATUS_FALLBACK:
+            print(f"第{note_data.get('row')}行为模板兜底内容，跳过: {note_data['title']}")
+            skipped += 1
+            continue
+        if ledger and ledger.is_published(note_data):
+            print(f"第{note_data.get('row')}行已发布，跳过: {note_data['title']}")
+            skipped += 1
+            continue
+        to_publish.append(note_data)
+    return to_publish, skipped
+
+def publish_with_ledger(publisher, note_data, ledger=None):
+    """
+    发布单条笔记并将状态、耗时写入台账
+    
+    Args:
+        publisher: 发布器
+        note_data: 笔记记录
+        ledger: 发布台账（PublishLedger），可选
+    
+    Returns:
+        bool: 发布是否成功
+    """
+    print(f"\n正在发布第{note_data.get('row')}行笔记...")
+    print(f"标题: {note_data['title']}")
+    print(f"内容: {note_data['content'][:50]}...")  # 只显示前50个字符
+    
+    start_time = time.time()
+    error = None
+    try:
+        success = bool(publisher.publish_note(note_data))
+    except Exception as e:
+        success = False
+        error = str(e)
+    duration = time.time() - start_time
+    
+    if ledger:
+        ledger.record(note_data, STATUS_PUBLISHED if success else STATUS_FAILED, duration, error)
+    print(f"第{note_data.get('row')}行笔记发布{'成功' if success else '失败'}，耗时 {duration:.1f}s")
+    return success
+
+def summarize_publish_results(results, skipped=0):
+    """
+    统计并打印批量发布结果
+    
+    Args:
+        results: 每条笔记的发布结果列表
+        skipped: 跳过的笔记数
+    
+    Returns:
+        dict: 统计信息（published/failed/skipped）
+    """
+    published = sum(1 for result in results if result)
+    stats = {'published': published, 'failed': len(results) - published, 'skipped': skipped}
+    print(f"\n本次发布成功 {stats['published']} 条，失败 {stats['failed']} 条，跳过 {stats['skipped']} 条")
+    # 登录和发布各阶段的耗时分布
+    get_default_recorder().print_summary()
+    return stats
+
 class XiaoHongShuPCAutomation:
     """小红书PC自动化主类"""
     
-    def __init__(self, headless=False, driver_path='./chromedriver.exe', reuse_browser=False):
+    def __init__(self, headless=False, driver_path='./chromedriver.exe', reuse_browser=False, session_store=None,
+                 fast_popups=False, popup_observer=False):
         """
         初始化小红书PC自动化对象
         
@@ -99,7 +379,12 @@ class XiaoHongShuPCAutomation:
             headless: 是否使用无头模式
             driver_path: ChromeDriver的路径
             reuse_browser: 是否尝试复用已打开的浏览器实例
+            session_store: 登录会话存储（SessionStore），可选，用于保存和恢复登录态
+            fast_popups: 是否用单次页面内脚本扫描弹窗，默认逐个选择器显式等待
+            popup_observer: 是否在页面内安装弹窗自动关闭观察器（仅fast_popups时生效）
         """
+        from browser_manager import BrowserManager
+        
         # 初始化各个模块
         # 初始化浏览器管理器，负责启动/关闭浏览器并返回 driver 与等待对象
         self.browser_manager = BrowserManager(headless=headless, driver_path=driver_path, reuse_browser=reuse_browser)
@@ -109,16 +394,24 @@ class XiaoHongShuPCAutomation:
         self.login_manager = None  # 初始化登录管理器，负责处理登录流程
         self.publisher = None  # 初始化发布器，负责发布笔记
         self.content_reader = None  # 初始化内容读取器，负责从Excel读取笔记数据
+        self.session_store = session_store  # 登录会话存储，负责保存和恢复登录态
+        self.fast_popups = fast_popups  # 是否用单次页面内脚本扫描弹窗
+        self.popup_observer = popup_observer  # 是否安装弹窗自动关闭观察器
     
     def initialize(self):
         """初始化所有组件"""
+        from popup_handler import PopupHandler
+        from login_manager import LoginManager
+        from publisher import Publisher
+        
         # 初始化浏览器
         # 调用 BrowserManager 初始化浏览器并返回 driver 与等待对象
         self.driver, self.wait = self.browser_manager.initialize_browser()
           
         # 初始化其他组件
-        self.popup_handler = PopupHandler(self.driver, self.wait)   
-        self.login_manager = LoginManager(self.driver, self.wait, self.popup_handler)
+        self.popup_handler = PopupHandler(self.driver, self.wait, fast_mode=self.fast_popups,
+                                          observe=self.popup_observer)
+        self.login_manager = LoginManager(self.driver, self.wait, self.popup_handler, session_store=self.session_store)
         self.publisher = Publisher(self.driver, self.wait, self.popup_handler)
     
     def open_xiaohongshu(self, is_creator=False):
@@ -156,6 +449,23 @@ class XiaoHongShuPCAutomation:
         """
         return self.publisher.publish_note(note_data)
     
+    def publish_notes(self, notes, ledger=None, limit=None, skipped=0):
+        """
+        批量发布笔记，已在台账中标记为发布成功的笔记会被跳过
+        
+        Args:
+            notes: 笔记记录列表
+            ledger: 发布台账（PublishLedger），可选，用于记录状态并跳过已发布的笔记
+            limit: 本次最多发布的笔记数，None表示全部
+            skipped: 调用方已经筛掉的笔记数，计入统计
+        
+        Returns:
+            dict: 本次发布的统计信息（published/failed/skipped）
+        """
+        to_publish, selected_skipped = select_notes_to_publish(notes, ledger, limit)
+        results = [publish_with_ledger(self.publisher, note_data, ledger) for note_data in to_publish]
+        return summarize_publish_results(results, skipped + selected_skipped)
+    
     def read_notes_from_excel(self, excel_file_path):
         """
         从Excel文件中读取笔记数据
@@ -166,6 +476,8 @@ class XiaoHongShuPCAutomation:
         Returns:
             list: 笔记数据列表
         """
+        from content_reader import ContentReader
+        
         self.content_reader = ContentReader(excel_file_path)
         try:
             return self.content_reader.read_all_notes()
@@ -177,6 +489,360 @@ class XiaoHongShuPCAutomation:
         """关闭浏览器"""
         self.browser_manager.close_browser()
 
+def open_single_browser(args):
+    """
+    初始化单个浏览器，打开创作服务平台并确保已登录
+    
+    Args:
+        args: 命令行参数
+    
+    Returns:
+        tuple: (自动化对象, 登录是否成功)
+    """
+    # 初始化自动化对象
+    print("正在初始化浏览器...")
+    xhs_automation = XiaoHongShuPCAutomation(headless=False, reuse_browser=args.reuse_browser,
+                                             session_store=SessionStore(args.session_path),
+                                             fast_popups=args.fast_popups, popup_observer=args.popup_observer)
+    xhs_automation.initialize()
+    
+    # 打开小红书
+    print("\n正在打开小红书创作服务平台...")
+    xhs_automation.open_xiaohongshu(is_creator=True)
+    
+    # 检查是否已登录（复用浏览器或已恢复会话快照时），已登录则跳过登录流程
+    print(f"\n正在检查登录状态...")
+    login_success = xhs_automation.login_manager._check_login_status()
+    if login_success:
+        print("已登录，跳过登录流程")
+    
+    # 如果未登录，则执行登录流程
+    if not login_success:
+        print(f"\n正在使用默认手机号登录...")
+        print("请确保手机能够接收到验证码")
+        login_success = xhs_automation.login(is_creator=True)
+    
+    print("\n登录成功！" if login_success else "\n登录失败！")
+    return xhs_automation, login_success
+
+def close_single_browser(xhs_automation, args):
+    """
+    根据命令行参数关闭浏览器或保持打开
+    
+    Args:
+        xhs_automation: 自动化对象
+        args: 命令行参数
+    """
+    if args.keep_browser_open:
+        print("\n浏览器将保持打开状态，您可以继续手动操作")
+        print("要关闭浏览器，请手动关闭窗口或重新运行脚本不带 --keep-browser-open 参数")
+    else:
+        # 关闭浏览器
+        print("\n正在关闭浏览器...")
+        xhs_automation.close()
+
+def publish_with_single_browser(notes, ledger, limit, args, skipped=0):
+    """
+    使用单个浏览器登录并发布笔记
+    
+    Args:
+        notes: 笔记记录列表
+        ledger: 发布台账（PublishLedger）
+        limit: 最多发布的笔记数，None表示全部
+        args: 命令行参数
+        skipped: 调用方已经筛掉的笔记数，计入统计
+    """
+    # 2. 初始化浏览器并发布笔记
+    print(f"\n=== 2. 开始小红书自动发布流程 ===")
+    
+    # 没有待发布的笔记时不启动浏览器
+    if not select_notes_to_publish(notes, ledger, limit)[0]:
+        print("没有待发布的笔记，跳过浏览器启动")
+        return
+    
+    xhs_automation, login_success = open_single_browser(args)
+    if login_success:
+        if notes:
+            print(f"共读取到 {len(notes)} 条笔记数据")
+            xhs_automation.publish_notes(notes, ledger, limit, skipped)
+        else:
+            print("\n没有读取到笔记数据！")
+    
+    # 根据命令行参数决定是否关闭浏览器
+    close_single_browser(xhs_automation, args)
+
+def ensure_worker_login(worker, login_lock):
+    """
+    打开浏览器池中某个浏览器的创作服务平台并确保已登录
+    
+    Args:
+        worker: 浏览器工作者（BrowserWorker）
+        login_lock: 登录锁，验证码需要人工输入，多个浏览器依次登录
+    """
+    worker.login_manager.open_xiaohongshu(is_creator=True)
+    if worker.login_manager._check_login_status():
+        return
+    with login_lock:
+        # 其他浏览器可能刚刚登录并保存了会话快照，先尝试恢复
+        if worker.login_manager.restore_session():
+            return
+        print(f"\n浏览器 {worker.index} 未登录，正在使用默认手机号登录...")
+        if not worker.login_manager.login(is_creator=True):
+            raise RuntimeError("登录失败")
+
+def publish_with_pool(notes, ledger=None, size=None, limit=None, headless=False, reuse_browser=False,
+                      session_store=None, fast_popups=False, popup_observer=False, skipped=0):
+    """
+    使用浏览器池并行发布笔记，每个浏览器使用独立的调试端口和配置文件
+    
+    Args:
+        notes: 笔记记录列表
+        ledger: 发布台账（PublishLedger），可选
+        size: 浏览器数量，None表示按CPU核数和可用内存自动估算
+        limit: 最多发布的笔记数，None表示全部
+        headless: 是否使用无头模式
+        reuse_browser: 是否尝试复用已打开的浏览器实例
+        session_store: 登录会话存储（SessionStore），可选，一个浏览器登录后其他浏览器直接恢复会话
+        fast_popups: 是否用单次页面内脚本扫描弹窗
+        popup_observer: 是否在页面内安装弹窗自动关闭观察器
+        skipped: 调用方已经筛掉的笔记数，计入统计
+    
+    Returns:
+        dict: 本次发布的统计信息（published/failed/skipped）
+    """
+    to_publish, selected_skipped = select_notes_to_publish(notes, ledger, limit)
+    skipped += selected_skipped
+    if not to_publish:
+        return summarize_publish_results([], skipped)
+    
+    from browser_pool import BrowserPool
+    
+    login_lock = threading.Lock()
+    
+    # 浏览器数量不超过待发布的笔记数
+    size = min(size or BrowserPool.default_size(), len(to_publish))
+    pool = BrowserPool(size=size, headless=headless, reuse_browser=reuse_browser, session_store=session_store,
+                       fast_popups=fast_popups, popup_observer=popup_observer).start(on_start=lambda worker: ensure_worker_login(worker, login_lock))
+    try:
+        results = pool.run(to_publish, lambda worker, note_data: publish_with_ledger(worker.publisher, note_data, ledger))
+    finally:
+        pool.close()
+    return summarize_publish_results(results, skipped)
+
+def compile_notes(notes, args, limit=None):
+    """
+    在启动浏览器前预处理图片并规范化、校验笔记，打印拒绝报告
+    
+    有数量上限时按顺序分批处理，通过校验的笔记达到上限后不再处理后面的行，
+    这些行不会出现在拒绝报告中，也不会预处理图片。
+    
+    Args:
+        notes: 待发布的笔记记录列表（已跳过发布过的行）
+        args: 命令行参数
+        limit: 最多需要的笔记数，None表示全部
+    
+    Returns:
+        list: 通过校验、可直接输入发布页的笔记列表
+    """
+    compiler = NoteCompiler()
+    report = CompileReport()
+    remaining = list(notes)
+    while remaining and (limit is None or len(report.notes) < limit):
+        needed = len(remaining) if limit is None else limit - len(report.notes)
+        chunk, remaining = remaining[:needed], remaining[needed:]
+        # 先统一缩放、压缩图片并转换为JPEG，再检查处理后的图片，heic、bmp等可以转换的格式不会被拒绝；
+        # 预处理失败或未安装Pillow而保留原图时，原图仍需满足平台的格式和大小限制
+        if not args.no_image_preprocess:
+            from image_preprocessor import ImagePreprocessor
+            ImagePreprocessor().preprocess_notes(chunk)
+        chunk_report = compiler.compile(chunk)
+        report.notes.extend(chunk_report.notes)
+        report.rejected.extend(chunk_report.rejected)
+    report.print_report()
+    if args.reject_report and report.rejected:
+        report.write(args.reject_report)
+    return report.notes
+
+def publish_pipeline_notes(notes, args):
+    """
+    按命令行参数预处理图片并发布笔记
+    
+    Args:
+        notes: 笔记记录列表
+        args: 命令行参数
+    """
+    # 默认只发布第一条未发布的笔记，--publish-all 时发布全部
+    publish_limit = None if args.publish_all else 1
+    ledger = PublishLedger(args.ledger_path)
+    try:
+        # 先跳过已发布和不可发布的行，标题、正文、图片等问题只对本次要发布的行在启动浏览器前检查，
+        # 不合格的行不会占用浏览器时间
+        candidates, skipped = select_notes_to_publish(notes, ledger)
+        notes = compile_notes(candidates, args, publish_limit)
+        
+        if args.workers != 1:
+            # 2. 使用浏览器池并行发布笔记
+            print(f"\n=== 2. 开始小红书并行发布流程 ===")
+            publish_with_pool(notes, ledger, size=args.workers or None, limit=publish_limit,
+                              reuse_browser=args.reuse_browser, session_store=SessionStore(args.session_path),
+                              fast_popups=args.fast_popups, popup_observer=args.popup_observer, skipped=skipped)
+        else:
+            publish_with_single_browser(notes, ledger, publish_limit, args, skipped)
+    finally:
+        ledger.close()
+
+def generate_and_publish(pipeline, args, api_key=None, client=None, controller=None):
+    """
+    流水线模式：生成与发布同时进行
+    
+    生成线程每完成一行就把笔记放入有界队列，发布端（单个浏览器或浏览器池）边取边发布；
+    队列满时暂停提交新的生成请求，浏览器启动和登录也与生成并行。
+    笔记按生成完成的顺序发布，已有正文的笔记最先发布。
+    
+    Args:
+        pipeline: 已加载的工作簿流水线（WorkbookPipeline）
+        args: 命令行参数
+        api_key: DeepSeek API密钥，可选
+        client: 生成客户端，有需要生成的行时必须提供
+        controller: 生成调用控制器（GenerationController），可选
+    
+    Returns:
+        dict: 本次发布的统计信息（published/failed/skipped）
+    """
+    print(f"\n=== 开始流水线模式：边生成边发布（队列长度 {args.queue_size}） ===")
+    start_time = time.time()
+    publish_limit = None if args.publish_all else 1
+    ledger = PublishLedger(args.ledger_path)
+    pending_rows = pipeline.pending_rows()
+    
+    # 既没有需要生成的行也没有待发布的笔记时不启动浏览器
+    ready_notes, skipped = select_notes_to_publish(pipeline.notes, ledger)
+    if not pending_rows and not ready_notes:
+        print("没有需要生成或发布的笔记，跳过浏览器启动")
+        ledger.close()
+        return summarize_publish_results([], skipped)
+    # 可能发布的笔记数：已有正文且未发布的行加上等待生成的行，不超过发布数量上限
+    publish_candidates = len(ready_notes) + len(pending_rows)
+    if publish_limit is not None:
+        publish_candidates = min(publish_candidates, publish_limit)
+    
+    note_queue = queue.Queue(maxsize=max(1, args.queue_size))
+    stop_event = threading.Event()
+    compiler = NoteCompiler()
+    
+    def _enqueue_compiled(note):
+        # 逐条编译，不合格的行不进入发布队列
+        compiled, reasons = compiler.compile_note(note)
+        if compiled is None:
+            print(f"第{note.row}行未通过预检，不加入发布队列: {'；'.join(reasons)}")
+            return
+        _enqueue(compiled)
+    
+    def _enqueue(note):
+        # 发布端提前退出（如登录失败）时不再阻塞生成线程
+        while not stop_event.is_set():
+            try:
+                note_queue.put(note, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+    
+    def _produce():
+        try:
+            # 图片与生成无关，先统一预处理，与浏览器启动并行
+            if not args.no_image_preprocess:
+                from image_preprocessor import ImagePreprocessor
+                ImagePreprocessor().preprocess_notes(pipeline.notes)
+            
+            # 已有正文的笔记无需等待生成（模板兜底的行会重新生成）
+            for note in pipeline.notes:
+                if note.title and note.content and not note.is_fallback:
+                    _enqueue_compiled(note)
+            
+            if pending_rows:
+                print(f"共有 {len(pending_rows)} 行需要生成内容，并发数：{max(1, args.concurrency)}")
+                
+                def _on_result(row, title, content, fallback):
+                    pipeline.set_content(row, content, fallback=fallback)
+                    if fallback:
+                        print(f"第{row}行为模板兜底内容，不加入发布队列")
+                        return
+                    print(f"第{row}行生成内容完成，加入发布队列")
+                    _enqueue_compiled(pipeline.get_note(row))
+                
+                # 正在生成和等待入队的行数受队列长度限制
+                # 发布端退出（包括Ctrl-C）后停止提交新的行，已完成的行已记录在生成日志中
+                generate_rows(pending_rows, api_key, args.concurrency, client, on_result=_on_result,
+                              max_pending=note_queue.maxsize + max(1, args.concurrency), controller=controller,
+                              batch_size=args.batch_size, stop_event=stop_event)
+        except Exception as e:
+            print(f"流水线生成过程中发生错误: {e}")
+            traceback.print_exc()
+        finally:
+            # 结束标记
+            _enqueue(None)
+    
+    claim_lock = threading.Lock()
+    counts = {'claimed': 0, 'skipped': 0}
+    
+    def _claim(note):
+        # 多个发布线程共享发布数量上限和台账检查
+        with claim_lock:
+            if not note.get('title') or not note.get('content') or note.is_fallback:
+                counts['skipped'] += 1
+                return False
+            if (publish_limit is not None and counts['claimed'] >= publish_limit) or ledger.is_published(note):
+                counts['skipped'] += 1
+                return False
+            counts['claimed'] += 1
+            return True
+    
+    def _publish(publisher, note):
+        if not _claim(note):
+            return None
+        return publish_with_ledger(publisher, note, ledger)
+    
+    producer = threading.Thread(target=_produce, daemon=True)
+    producer.start()
+    results = []
+    try:
+        if args.workers != 1:
+            from browser_pool import BrowserPool
+            
+            login_lock = threading.Lock()
+            # 浏览器数量不超过可能发布的笔记数，避免为一条笔记启动并登录多个浏览器
+            size = min(args.workers or BrowserPool.default_size(), publish_candidates)
+            pool = BrowserPool(size=size, reuse_browser=args.reuse_browser, session_store=SessionStore(args.session_path),
+                               fast_popups=args.fast_popups, popup_observer=args.popup_observer)
+            try:
+                pool.start(on_start=lambda worker: ensure_worker_login(worker, login_lock))
+                results = pool.consume(note_queue, lambda worker, note: _publish(worker.publisher, note))
+            finally:
+                pool.close()
+        else:
+            xhs_automation, login_success = open_single_browser(args)
+            try:
+                if login_success:
+                    while True:
+                        note = note_queue.get()
+                        if note is None:
+                            break
+                        results.append(_publish(xhs_automation.publisher, note))
+            finally:
+                close_single_browser(xhs_automation, args)
+    finally:
+        # 发布端退出后生成线程停止提交新的行，只等待正在进行的请求
+        stop_event.set()
+        producer.join()
+        ledger.close()
+    
+    stats = summarize_publish_results([result for result in results if result is not None], counts['skipped'])
+    print(f"流水线总耗时 {time.time() - start_time:.1f}s")
+    if client is not None and client.cache is not None:
+        cache_stats = client.cache.stats()
+        print(f"生成缓存命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次，当前缓存 {cache_stats['entries']} 条")
+    return stats
+
 # 示例用法
 if __name__ == "__main__":
 
@@ -189,7 +855,50 @@ if __name__ == "__main__":
                            help='保持浏览器打开状态，不自动关闭')
         parser.add_argument('--reuse-browser', action='store_true',
                            help='尝试复用已打开的浏览器实例，避免重新登录')
+        parser.add_argument('--concurrency', type=int, default=4,
+                           help='内容生成的初始并发请求数（默认4），调用成功时逐步增加，限流或超时时减半')
+        parser.add_argument('--max-concurrency', type=int, default=16,
+                           help='内容生成的并发请求数上限（默认16）')
+        parser.add_argument('--retry-attempts', type=int, default=4,
+                           help='每个标题最多调用API的次数（默认4），用尽后使用模板兜底并在F列标记')
+        parser.add_argument('--stream', action='store_true',
+                           help='流式生成，达到700字后立即停止接收（提前断开的连接不能复用，默认等待完整响应后截断）')
+        parser.add_argument('--batch-size', type=int, default=1,
+                           help='每个生成请求包含的标题数（默认1）；增大可减少请求次数，但一次失败影响的行数更多')
+        parser.add_argument('--cache-path', default='generation_cache.db',
+                           help='生成结果缓存的SQLite文件路径（默认generation_cache.db）')
+        parser.add_argument('--no-cache', action='store_true',
+                           help='禁用生成结果缓存，每个标题都调用API')
+        parser.add_argument('--no-resume', action='store_true',
+                           help='丢弃上次中断留下的生成日志，重新生成所有空白行')
+        parser.add_argument('--generate-only', action='store_true',
+                           help='只生成内容，不启动浏览器发布')
+        parser.add_argument('--publish-all', action='store_true',
+                           help='批量发布所有未发布的笔记（默认只发布一条）')
+        parser.add_argument('--ledger-path', default='publish_ledger.db',
+                           help='发布台账的SQLite文件路径（默认publish_ledger.db）')
+        parser.add_argument('--workers', type=int, default=1,
+                           help='并行发布的浏览器数量（默认1，0表示按CPU和内存自动估算）')
+        parser.add_argument('--no-image-preprocess', action='store_true',
+                           help='不预处理图片，直接上传原图')
+        parser.add_argument('--session-path', default='session_snapshot.json',
+                           help='登录会话快照文件路径（默认session_snapshot.json，包含登录凭证）')
+        parser.add_argument('--placeholder-dir', default=None,
+                           help='没有图片的笔记使用的占位图片目录（默认本地自动生成）')
+        parser.add_argument('--timing-log', default='timings.jsonl',
+                           help='登录和发布各阶段耗时的JSON-lines输出文件（默认timings.jsonl，空字符串表示不写文件）')
+        parser.add_argument('--reject-report', default='rejected_notes.json',
+                           help='发布前预检未通过的行及原因的JSON输出文件（默认rejected_notes.json，空字符串表示不写文件）')
+        parser.add_argument('--pipelined', action='store_true',
+                           help='流水线模式：每生成完一行立即交给浏览器发布，生成与发布同时进行')
+        parser.add_argument('--queue-size', type=int, default=4,
+                           help='流水线模式下已生成、等待发布的最大笔记数（默认4）')
+        parser.add_argument('--fast-popups', action='store_true',
+                           help='用一次页面内脚本扫描所有弹窗关闭按钮（默认逐个选择器等待，每个最多1秒）')
+        parser.add_argument('--popup-observer', action='store_true',
+                           help='配合--fast-popups，在页面内安装观察器，弹窗出现时自动关闭')
         args = parser.parse_args()
+        configure_default_recorder(args.timing_log or None)
         
         print("=== 小红书PC自动化脚本 ===")
         print("本脚本用于自动化生成Excel内容并发布小红书笔记")
@@ -205,68 +914,48 @@ if __name__ == "__main__":
         # 设置DeepSeek API密钥
         api_key = '你的deepseekAPIkey'
         
-        # 处理Excel文件，生成内容
-        process_excel(excel_file, api_key)
+        from pipeline import WorkbookPipeline
         
-        # 2. 初始化浏览器并发布笔记
-        print(f"\n=== 2. 开始小红书自动发布流程 ===")
+        # 提前在后台准备占位图片，发布没有图片的笔记时无需等待
+        if not args.generate_only:
+            from placeholder_images import get_default_pool
+            get_default_pool(source_dir=args.placeholder_dir)
         
-        # 初始化自动化对象
-        print("正在初始化浏览器...")
-        xhs_automation = XiaoHongShuPCAutomation(headless=False, reuse_browser=args.reuse_browser)
-        xhs_automation.initialize()
-        
-        # 打开小红书
-        print("\n正在打开小红书创作服务平台...")
-        xhs_automation.open_xiaohongshu(is_creator=True)
-        
-        # 检查是否已登录，如果复用浏览器且已登录则跳过登录流程
-        login_success = True
-        if args.reuse_browser:
-            print(f"\n正在检查登录状态...")
-            login_success = xhs_automation.login_manager._check_login_status()
-            if login_success:
-                print("已登录，跳过登录流程")
-        
-        # 如果未登录，则执行登录流程
-        if not login_success:
-            print(f"\n正在使用默认手机号登录...")
-            print("请确保手机能够接收到验证码")
-            login_success = xhs_automation.login(is_creator=True)
-        
-        if login_success:
-            print("\n登录成功！")
-            # 从Excel读取笔记数据
-            print(f"\n正在从Excel文件 {excel_file} 读取笔记数据...")
-            notes = xhs_automation.read_notes_from_excel(excel_file)
+        # 加载一次工作簿，生成结果保存在内存中，发布结束后统一写回
+        pipeline = WorkbookPipeline(excel_file, resume=not args.no_resume).load()
+        try:
+            # 有需要生成的行时才创建共享的生成客户端，按需启用持久化缓存
+            generation_client = None
+            generation_controller = None
+            if pipeline.pending_rows():
+                from llm_client import get_client
+                from adaptive_concurrency import AdaptiveLimiter, RetryPolicy, GenerationController
+                generation_cache = None if args.no_cache else GenerationCache(args.cache_path)
+                # 重试由自适应控制器负责，关闭SDK内置重试，避免限流时重试次数叠加
+                generation_client = get_client(api_key, cache=generation_cache, max_retries=0,
+                                               stream=args.stream)
+                generation_controller = GenerationController(
+                    AdaptiveLimiter(initial=args.concurrency, max_limit=max(args.concurrency, args.max_concurrency)),
+                    RetryPolicy(max_attempts=args.retry_attempts)
+                )
             
-            if notes:
-                print(f"共读取到 {len(notes)} 条笔记数据")
-                # 发布第一条笔记
-                print("\n正在发布第一条笔记...")
-                note_data = notes[0]
-                print(f"标题: {note_data['title']}")
-                print(f"内容: {note_data['content'][:50]}...")  # 只显示前50个字符
-                
-                publish_success = xhs_automation.publish_note(note_data)
-                
-                if publish_success:
-                    print("\n笔记发布成功！")
-                else:
-                    print("\n笔记发布失败！")
+            if args.generate_only:
+                if generation_client is not None:
+                    generate_missing(pipeline, api_key, concurrency=args.concurrency, client=generation_client,
+                                     controller=generation_controller, batch_size=args.batch_size)
+                print("\n已指定 --generate-only，跳过发布流程")
+            elif args.pipelined:
+                # 生成与发布重叠进行，总耗时接近两者中较慢的一个
+                generate_and_publish(pipeline, args, api_key, client=generation_client, controller=generation_controller)
             else:
-                print("\n没有读取到笔记数据！")
-        else:
-            print("\n登录失败！")
-        
-        # 根据命令行参数决定是否关闭浏览器
-        if args.keep_browser_open:
-            print("\n浏览器将保持打开状态，您可以继续手动操作")
-            print("要关闭浏览器，请手动关闭窗口或重新运行脚本不带 --keep-browser-open 参数")
-        else:
-            # 关闭浏览器
-            print("\n正在关闭浏览器...")
-            xhs_automation.close()
+                if generation_client is not None:
+                    generate_missing(pipeline, api_key, concurrency=args.concurrency, client=generation_client,
+                                     controller=generation_controller, batch_size=args.batch_size)
+                publish_pipeline_notes(pipeline.notes, args)
+        finally:
+            # 统一写回生成的内容
+            pipeline.flush()
+            pipeline.close()
         
         print("\n=== 脚本执行完毕 ===")
     except Exception as e:
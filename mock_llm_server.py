@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地OpenAI兼容的模拟LLM服务，用于离线基准测试
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockLLMServer:
+    """模拟LLM服务类，在后台线程中提供 /chat/completions 接口"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.05, handshake_latency=0.05, latency_jitter=0.0,
+                 error_rate=0.0, rate_limit_rate=0.0, max_concurrency=None, retry_after=0.1, seed=None,
+                 content_length=None, chunk_size=20, chunk_latency=0.0, batch_malformed_rate=0.0):
+        """
+        初始化模拟LLM服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            latency: 每个请求的模拟生成耗时（秒）
+            handshake_latency: 每个新连接首个请求的额外耗时（秒），模拟TLS握手开销
+            latency_jitter: 生成耗时的随机波动上限（秒），每个请求额外等待0到该值之间的时间
+            error_rate: 随机返回500错误的比例（0-1）
+            rate_limit_rate: 随机返回429限流的比例（0-1）
+            max_concurrency: 同时处理的最大请求数，可选，超过时返回429，模拟账号的并发配额
+            retry_after: 429响应中建议的重试等待时间（秒）
+            seed: 随机数种子，可选，便于复现
+            content_length: 模拟生成内容的字符数，可选，默认返回一句简短内容
+            chunk_size: 流式响应每个分片的字符数
+            chunk_latency: 每个分片的模拟生成耗时（秒），非流式请求等待全部分片生成完后一次返回
+            batch_malformed_rate: 批量请求返回格式错误（缺少条目或不是JSON）的比例
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.handshake_latency = handshake_latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.content_length = content_length
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_latency = chunk_latency
+        self.batch_malformed_rate = batch_malformed_rate
+        self.sent_chars = 0
+        self.request_count = 0
+        self.connection_count = 0
+        self.status_counts = {}
+        self.in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """OpenAI客户端使用的base_url"""
+        return f"http://{self.host}:{self.port}"
+
+    def _record_connection(self):
+        """记录新建连接数"""
+        with self._lock:
+            self.connection_count += 1
+
+    def _record_request(self):
+        """记录请求数"""
+        with self._lock:
+            self.request_count += 1
+
+    def _record_status(self, status):
+        """按状态码记录响应数"""
+        with self._lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def _enter_request(self):
+        """
+        登记一个正在处理的请求，并决定是否注入故障
+
+        Returns:
+            int: 需要返回的错误状态码（429或500），正常处理时返回None
+        """
+        with self._lock:
+            if self.max_concurrency is not None and self.in_flight >= self.max_concurrency:
+                return 429
+            self.in_flight += 1
+            roll = self._random.random()
+            jitter = self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0.0
+        if roll < self.rate_limit_rate:
+            self._leave_request()
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            time.sleep(self.latency)
+            self._leave_request()
+            return 500
+        time.sleep(self.latency + jitter)
+        return None
+
+    def _build_content(self, title):
+        """
+        构造模拟的生成内容
+
+        Args:
+            title: 用户消息中的标题
+
+        Returns:
+            str: 模拟内容
+        """
+        if not self.content_length:
+            return f"模拟生成的内容。{title}"
+        sentence = f"这是关于{title}的一句模拟内容。"
+        repeat = self.content_length // len(sentence) + 1
+        return (sentence * repeat)[:self.content_length]
+
+    def _build_batch_content(self, user_message):
+        """
+        用户消息是批量标题JSON时构造批量响应
+
+        Args:
+            user_message: 用户消息
+
+        Returns:
+            str: JSON格式的批量内容，不是批量请求时返回None
+        """
+        try:
+            payload = json.loads(user_message)
+        except ValueError:
+            return None
+        if not isinstance(payload, dict) or not isinstance(payload.get('titles'), list):
+            return None
+        items = [{"index": item.get('index'), "content": self._build_content(f"标题：{item.get('title', '')}")}
+                 for item in payload['titles']]
+        with self._lock:
+            malformed = self._random.random() < self.batch_malformed_rate
+            choice = self._random.random()
+        if malformed and (choice < 0.5 or len(items) < 2):
+            return "抱歉，这次没能按JSON格式输出。"
+        if malformed:
+            # 丢掉一个条目，模拟模型漏写
+            items.pop(len(items) // 2)
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    def _record_sent(self, chars):
+        """记录实际发送给客户端的字符数"""
+        with self._lock:
+            self.sent_chars += chars
+
+    def _leave_request(self):
+        """注销一个正在处理的请求"""
+        with self._lock:
+            self.in_flight -= 1
+
+    def _build_handler(self):
+        """构造绑定到当前服务实例的请求处理类"""
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            # 使用HTTP/1.1以支持keep-alive长连接
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                self._is_new_connection = True
+                server._record_connection()
+
+            def log_message(self, format, *args):
+                # 关闭默认的访问日志输出
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                server._record_request()
+
+                if self._is_new_connection:
+                    self._is_new_connection = False
+                    time.sleep(server.handshake_latency)
+
+                if not self.path.endswith('/chat/completions'):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                failure = server._enter_request()
+                if failure == 429:
+                    self._send_json(429, {"error": {"message": "rate limit exceeded", "type": "rate_limit_error"}},
+                                    {'retry-after-ms': str(int(server.retry_after * 1000)),
+                                     'retry-after': str(math.ceil(server.retry_after))})
+                    return
+                if failure == 500:
+                    self._send_json(500, {"error": {"message": "internal error", "type": "server_error"}})
+                    return
+                server._leave_request()
+
+                title = ''
+                for message in body.get('messages', []):
+                    if message.get('role') == 'user':
+                        title = message.get('content', '')
+                content = server._build_batch_content(title)
+                if content is None:
+                    content = server._build_content(title)
+                chunks = [content[i:i + server.chunk_size] for i in range(0, len(content), server.chunk_size)]
+                if body.get('stream'):
+                    self._send_stream(body, chunks)
+                    return
+
+                time.sleep(server.chunk_latency * len(chunks))
+                server._record_sent(len(content))
+                self._send_json(200, {
+                    "id": f"mock-{server.request_count}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get('model', 'mock'),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                })
+
+            def _send_stream(self, body, chunks):
+                # 以SSE分片返回，客户端提前断开时停止生成
+                server._record_status(200)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                base = {"id": f"mock-{server.request_count}", "object": "chat.completion.chunk",
+                        "created": int(time.time()), "model": body.get('model', 'mock')}
+                try:
+                    for text in chunks:
+                        time.sleep(server.chunk_latency)
+                        event = dict(base, choices=[{"index": 0, "delta": {"content": text}, "finish_reason": None}])
+                        self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n")
+                        server._record_sent(len(text))
+                    event = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n")
+                    self._write_chunk("data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+            def _write_chunk(self, text):
+                data = text.encode('utf-8')
+                self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                server._record_status(status)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return _Handler
+
+    def start(self):
+        """在后台线程启动服务"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._build_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        """上下文管理器进入方法"""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出方法"""
+        self.stop()
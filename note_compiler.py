@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+笔记编译器，负责在启动浏览器前一次性规范化并校验所有笔记，生成可直接输入的记录和拒绝报告
+"""
+
+import json
+import os
+import re
+from content_reader import NoteRecord
+
+# 平台限制
+TITLE_MAX_LENGTH = 20           # 标题最多20个字
+CONTENT_MAX_LENGTH = 1000       # 正文最多1000个字
+MAX_TAGS = 10                   # 话题标签数量上限，超出部分丢弃
+MAX_IMAGES = 18                 # 每条笔记最多18张图片
+MAX_IMAGE_BYTES = 20 * 1024 * 1024  # 单张图片大小上限（字节）
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# ChromeDriver的send_keys不支持BMP以外的字符（如大部分emoji）
+_NON_BMP_PATTERN = re.compile('[\U00010000-\U0010FFFF]')
+_TAG_SEPARATOR_PATTERN = re.compile(r'[#\s,，、]+')
+_BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+
+def filter_non_bmp(text):
+    """
+    过滤掉非BMP字符，只保留BMP字符
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        str: 只包含BMP字符的文本
+    """
+    return _NON_BMP_PATTERN.sub('', text or '')
+
+def normalize_title(title):
+    """
+    规范化标题：过滤非BMP字符，合并连续空白
+
+    Args:
+        title: 原始标题
+
+    Returns:
+        str: 规范化后的标题
+    """
+    return ' '.join(filter_non_bmp(str(title or '')).split())
+
+def normalize_content(content):
+    """
+    规范化正文：过滤非BMP字符，统一换行符，去掉行尾空白并合并多余空行
+
+    Args:
+        content: 原始正文
+
+    Returns:
+        str: 规范化后的正文
+    """
+    text = filter_non_bmp(str(content or '')).replace('\r\n', '\n').replace('\r', '\n')
+    text = '\n'.join(line.rstrip() for line in text.split('\n'))
+    return _BLANK_LINES_PATTERN.sub('\n\n', text).strip()
+
+def parse_tags(tags):
+    """
+    解析话题标签：去掉#号，按空白和逗号拆分，去重并保持顺序
+
+    Args:
+        tags: 标签列表（单元格按分号拆分后的结果）
+
+    Returns:
+        list: 标签列表
+    """
+    parsed = []
+    for item in tags or []:
+        for tag in _TAG_SEPARATOR_PATTERN.split(filter_non_bmp(str(item))):
+            if tag and tag not in parsed:
+                parsed.append(tag)
+    return parsed
+
+def check_image(path, max_bytes=MAX_IMAGE_BYTES):
+    """
+    检查图片文件是否可以上传
+
+    Args:
+        path: 图片路径
+        max_bytes: 单张图片大小上限（字节），None表示不检查大小
+
+    Returns:
+        str: 不能上传的原因，可以上传时返回None
+    """
+    if not os.path.isfile(path):
+        return f"图片不存在: {path}"
+    if not path.lower().endswith(IMAGE_EXTENSIONS):
+        return f"图片格式不支持: {path}"
+    size = os.path.getsize(path)
+    if size == 0:
+        return f"图片为空文件: {path}"
+    if max_bytes is not None and size > max_bytes:
+        return f"图片超过{max_bytes // 1024 // 1024}MB: {path}"
+    return None
+
+class CompiledNote(NoteRecord):
+    """编译后的笔记记录类，字段已规范化，可直接输入发布页"""
+
+    __slots__ = ('source', 'warnings')
+
+    def __init__(self, source, title, content, image_paths, tags, category, warnings=None):
+        """
+        初始化编译后的笔记记录
+
+        Args:
+            source: 原始笔记记录（NoteRecord），发布台账按原始标题和正文计算唯一键
+            title: 规范化后的标题
+            content: 规范化后的正文
+            image_paths: 已检查过的图片绝对路径列表
+            tags: 解析后的话题标签列表
+            category: 规范化后的分类
+            warnings: 编译时的提示信息列表（如丢弃了多余的标签）
+        """
+        super().__init__(source.row, title=title, content=content, image_paths=image_paths, tags=tags,
+                         category=category, generation_status=source.generation_status)
+        self.source = source
+        self.warnings = warnings or []
+
+    def __repr__(self):
+        return f"CompiledNote(row={self.row}, title={self.title!r})"
+
+class CompileReport:
+    """编译结果类，包含可发布的笔记和被拒绝的行"""
+
+    def __init__(self):
+        """初始化编译结果"""
+        self.notes = []
+        self.rejected = []
+
+    def print_report(self):
+        """打印编译结果和拒绝原因"""
+        warned = [note for note in self.notes if note.warnings]
+        print(f"笔记预检完成：通过 {len(self.notes)} 条，拒绝 {len(self.rejected)} 条")
+        for note in warned:
+            print(f"  第{note.row}行提示: {'；'.join(note.warnings)}")
+        for item in self.rejected:
+            print(f"  第{item['row']}行被拒绝（{item['title'] or '无标题'}）: {'；'.join(item['reasons'])}")
+
+    def write(self, path):
+        """
+        将拒绝报告写入JSON文件
+
+        Args:
+            path: 输出文件路径
+        """
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.rejected, f, ensure_ascii=False, indent=2)
+            print(f"拒绝报告已保存到 {path}")
+        except Exception as e:
+            print(f"保存拒绝报告失败: {e}")
+
+class NoteCompiler:
+    """笔记编译器类，在任何浏览器操作之前规范化并校验笔记"""
+
+    def __init__(self, title_max_length=TITLE_MAX_LENGTH, content_max_length=CONTENT_MAX_LENGTH,
+                 max_tags=MAX_TAGS, max_images=MAX_IMAGES, max_image_bytes=MAX_IMAGE_BYTES):
+        """
+        初始化笔记编译器
+
+        Args:
+            title_max_length: 标题最大字数
+            content_max_length: 正文最大字数
+            max_tags: 话题标签数量上限
+            max_images: 每条笔记的图片数量上限
+            max_image_bytes: 单张图片大小上限（字节），None表示不检查，例如发布前会统一压缩图片时
+        """
+        self.title_max_length = title_max_length
+        self.content_max_length = content_max_length
+        self.max_tags = max_tags
+        self.max_images = max_images
+        self.max_image_bytes = max_image_bytes
+
+    def compile_note(self, note):
+        """
+        编译单条笔记
+
+        Args:
+            note: 笔记记录（NoteRecord）
+
+        Returns:
+            tuple: (编译后的笔记, 拒绝原因列表)，被拒绝时编译后的笔记为None
+        """
+        reasons = []
+        warnings = []
+
+        title = normalize_title(note.title)
+        if not title:
+            reasons.append("标题为空")
+        elif len(title) > self.title_max_length:
+            reasons.append(f"标题超过{self.title_max_length}字（{len(title)}字）")
+
+        tags = parse_tags(note.tags)
+        if len(tags) > self.max_tags:
+            warnings.append(f"话题标签超过{self.max_tags}个，已丢弃: {'、'.join(tags[self.max_tags:])}")
+            tags = tags[:self.max_tags]
+
+        content = normalize_content(note.content)
+        # 发布页没有独立的标签输入框时，话题以#标签的形式写在正文最后一段，同样计入正文字数
+        content_length = len(content) + (len('\n' + ' '.join('#' + tag for tag in tags)) if tags else 0)
+        if not content:
+            reasons.append("正文为空")
+        elif content_length > self.content_max_length:
+            detail = f"{len(content)}字，加话题标签共{content_length}字" if tags else f"{len(content)}字"
+            reasons.append(f"正文超过{self.content_max_length}字（{detail}）")
+
+        if len(note.image_paths) > self.max_images:
+            reasons.append(f"图片超过{self.max_images}张（{len(note.image_paths)}张）")
+        image_paths = []
+        for path in note.image_paths:
+            path = os.path.abspath(os.path.expanduser(path))
+            problem = check_image(path, self.max_image_bytes)
+            if problem:
+                reasons.append(problem)
+            else:
+                image_paths.append(path)
+
+        category = normalize_title(note.category)
+
+        if reasons:
+            return None, reasons
+        return CompiledNote(note, title, content, image_paths, tags, category, warnings), []
+
+    def compile(self, notes):
+        """
+        编译所有笔记
+
+        Args:
+            notes: 笔记记录列表
+
+        Returns:
+            CompileReport: 可发布的笔记和拒绝报告
+        """
+        report = CompileReport()
+        for note in notes:
+            compiled, reasons = self.compile_note(note)
+            if compiled is None:
+                report.rejected.append({'row': note.row, 'title': note.title, 'reasons': reasons})
+            else:
+                report.notes.append(compiled)
+        return report
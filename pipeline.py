@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作簿流水线，负责一次解析Excel并在生成与发布之间传递内存中的笔记记录
+"""
+
+import openpyxl
+from content_reader import NOTE_COLUMNS, NoteRecord
+from generation_journal import GenerationJournal, GENERATION_STATUS_FALLBACK
+
+# B列: 正文内容
+CONTENT_COLUMN = 2
+# F列: 生成状态
+STATUS_COLUMN = 6
+
+class WorkbookPipeline:
+    """工作簿流水线类，加载一次工作簿，所有写回在结束时统一保存"""
+
+    def __init__(self, file_path, resume=True):
+        """
+        初始化工作簿流水线
+
+        Args:
+            file_path: Excel文件路径
+            resume: 是否回放上次未合并的生成日志，默认True；为False时丢弃旧日志
+        """
+        self.file_path = file_path
+        self.resume = resume
+        self.journal = GenerationJournal(GenerationJournal.path_for(file_path))
+        self.workbook = None
+        self.sheet = None
+        self.notes = []
+        self._notes_by_row = {}
+        self._pending_writes = {}
+
+    def load(self):
+        """
+        加载并解析工作簿，回放生成日志中已完成的行
+
+        Returns:
+            WorkbookPipeline: 当前流水线，便于链式调用
+        """
+        if not self.resume:
+            self.journal.clear()
+
+        self.workbook = openpyxl.load_workbook(self.file_path)
+        self.sheet = self.workbook.active
+        print(f"已打开Excel文件: {self.file_path}")
+
+        # 从第2行开始解析（第1行是表头），只遍历一次
+        self.notes = []
+        for row_num, values in enumerate(
+                self.sheet.iter_rows(min_row=2, max_col=NOTE_COLUMNS, values_only=True), start=2):
+            if not any(values):
+                continue
+            self.notes.append(NoteRecord.from_values(row_num, values))
+        self._notes_by_row = {note.row: note for note in self.notes}
+
+        # 日志中已有同一标题的结果则直接恢复，不再调用API
+        restored = 0
+        for row_num, record in self.journal.replay().items():
+            note = self._notes_by_row.get(row_num)
+            if note and (not note.content or note.is_fallback) and note.title == record['title']:
+                self.set_content(row_num, record['content'], journal=False, fallback=record.get('fallback', False))
+                restored += 1
+        if restored:
+            print(f"从生成日志恢复 {restored} 行，跳过重新生成")
+
+        print(f"共解析到 {len(self.notes)} 条笔记数据")
+        return self
+
+    def pending_rows(self):
+        """
+        获取需要生成内容的行
+
+        Returns:
+            list: 有标题但正文为空或为模板兜底内容的 (行号, 标题) 列表
+        """
+        return [(note.row, note.title) for note in self.notes if note.title and (not note.content or note.is_fallback)]
+
+    def get_note(self, row_num):
+        """
+        获取某行的笔记记录
+
+        Args:
+            row_num: 行号
+
+        Returns:
+            NoteRecord: 笔记记录，不存在时返回None
+        """
+        return self._notes_by_row.get(row_num)
+
+    def set_content(self, row_num, content, journal=True, fallback=False):
+        """
+        更新某行的正文内容，写回推迟到flush
+
+        Args:
+            row_num: 行号
+            content: 正文内容
+            journal: 是否追加到生成日志，默认True
+            fallback: 内容是否为模板兜底，是则在F列标记，下次运行重新生成
+        """
+        note = self._notes_by_row[row_num]
+        note.content = content
+        note.generation_status = GENERATION_STATUS_FALLBACK if fallback else ''
+        self._pending_writes[row_num] = (content, note.generation_status)
+        if journal:
+            self.journal.append(row_num, note.title, content, fallback=fallback)
+
+    def flush(self):
+        """将所有待写回的内容一次性写入工作簿并保存，成功后清理生成日志"""
+        if self.workbook is None:
+            return
+        if self._pending_writes:
+            for row_num in sorted(self._pending_writes):
+                content, status = self._pending_writes[row_num]
+                self.sheet.cell(row=row_num, column=CONTENT_COLUMN).value = content
+                self.sheet.cell(row=row_num, column=STATUS_COLUMN).value = status or None
+            self.workbook.save(self.file_path)
+            print(f"已将 {len(self._pending_writes)} 行写回并保存到{self.file_path}")
+            self._pending_writes = {}
+        self.journal.clear()
+
+    def close(self):
+        """关闭工作簿和生成日志，未flush的内容仍保留在日志中"""
+        self.journal.close()
+        if self.workbook:
+            self.workbook.close()
+            self.workbook = None
+            self.sheet = None
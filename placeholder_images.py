@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+占位图片池，负责为没有图片的笔记提前准备好本地占位图片
+"""
+
+import os
+import queue
+import random
+import struct
+import threading
+import uuid
+import zlib
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+def _write_png(path, width, height, color):
+    """
+    不依赖第三方库写入一张纯色PNG
+
+    Args:
+        path: 输出路径
+        width: 宽度
+        height: 高度
+        color: (R, G, B) 颜色
+    """
+    def _chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    scanline = b'\x00' + bytes(color) * width
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_chunk(b'IHDR', header))
+        f.write(_chunk(b'IDAT', zlib.compress(scanline * height, 6)))
+        f.write(_chunk(b'IEND', b''))
+
+class PlaceholderImagePool:
+    """占位图片池类，后台线程提前补充图片，发布时直接取用"""
+
+    def __init__(self, pool_dir='.placeholder_images', source_dir=None, target_size=6, image_size=1024):
+        """
+        初始化占位图片池
+
+        Args:
+            pool_dir: 本地生成图片的存放目录
+            source_dir: 现成图片目录，可选，提供时从中轮流取图而不再生成
+            target_size: 池中保持就绪的图片数量
+            image_size: 本地生成图片的边长（像素）
+        """
+        self.pool_dir = pool_dir
+        self.source_dir = source_dir
+        self.target_size = target_size
+        self.image_size = image_size
+        self._ready = queue.Queue()
+        self._refill_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._source_files = []
+        self._source_lock = threading.Lock()
+
+        if source_dir:
+            self._source_files = sorted(
+                os.path.join(source_dir, name) for name in os.listdir(source_dir)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            if not self._source_files:
+                print(f"占位图片目录中没有图片，将改为本地生成: {source_dir}")
+        elif os.path.isdir(pool_dir):
+            # 复用上次运行剩余的已生成图片
+            for name in sorted(os.listdir(pool_dir)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    self._ready.put(os.path.abspath(os.path.join(pool_dir, name)))
+
+    def start(self):
+        """
+        启动后台补充线程
+
+        Returns:
+            PlaceholderImagePool: 当前图片池
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refill_loop, daemon=True)
+            self._thread.start()
+            self._refill_event.set()
+        return self
+
+    def _refill_loop(self):
+        """后台补充图片，直到池中就绪图片达到目标数量"""
+        while not self._stop_event.is_set():
+            self._refill_event.wait()
+            self._refill_event.clear()
+            while not self._stop_event.is_set() and self._ready.qsize() < self.target_size:
+                try:
+                    self._ready.put(self._create_image())
+                except Exception as e:
+                    print(f"生成占位图片失败: {e}")
+                    break
+
+    def _create_image(self):
+        """
+        准备一张占位图片
+
+        Returns:
+            str: 图片路径
+        """
+        if self._source_files:
+            with self._source_lock:
+                path = self._source_files.pop(0)
+                self._source_files.append(path)
+            return os.path.abspath(path)
+
+        try:
+            from PIL import Image
+        except ImportError:  # 未安装Pillow时使用纯Python生成纯色PNG
+            Image = None
+
+        os.makedirs(self.pool_dir, exist_ok=True)
+        start_color = tuple(random.randint(40, 230) for _ in range(3))
+        if Image is None:
+            path = os.path.join(self.pool_dir, f"{uuid.uuid4().hex}.png")
+            _write_png(path, self.image_size, self.image_size, start_color)
+        else:
+            # 两种随机颜色之间的纵向渐变
+            end_color = tuple(random.randint(40, 230) for _ in range(3))
+            gradient = Image.linear_gradient('L').resize((self.image_size, self.image_size))
+            image = Image.composite(
+                Image.new('RGB', gradient.size, end_color),
+                Image.new('RGB', gradient.size, start_color),
+                gradient
+            )
+            path = os.path.join(self.pool_dir, f"{uuid.uuid4().hex}.jpg")
+            image.save(path, 'JPEG', quality=85)
+        return os.path.abspath(path)
+
+    def take(self, count):
+        """
+        取出若干张占位图片，池中不足时在当前线程本地生成，不会等待网络
+
+        Args:
+            count: 图片数量
+
+        Returns:
+            list: 图片路径列表
+        """
+        paths = []
+        for _ in range(count):
+            try:
+                paths.append(self._ready.get_nowait())
+            except queue.Empty:
+                paths.append(self._create_image())
+        # 通知后台线程补充
+        self._refill_event.set()
+        return paths
+
+    def discard(self, paths):
+        """
+        删除已用完的本地生成图片，来自现成图片目录的文件会保留
+
+        Args:
+            paths: 图片路径列表
+        """
+        pool_dir = os.path.abspath(self.pool_dir)
+        for path in paths:
+            if os.path.dirname(os.path.abspath(path)) == pool_dir and os.path.exists(path):
+                os.unlink(path)
+
+    def stop(self):
+        """停止后台补充线程"""
+        self._stop_event.set()
+        self._refill_event.set()
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_default_pool(**kwargs):
+    """
+    获取共享的占位图片池，首次调用时创建并启动后台补充
+
+    Args:
+        **kwargs: 首次创建时传给PlaceholderImagePool的参数
+
+    Returns:
+        PlaceholderImagePool: 共享的占位图片池
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = PlaceholderImagePool(**kwargs).start()
+        return _default_pool
@@ -6,43 +6,113 @@
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+import time
+
+# 逐个显式等待时每个选择器的等待上限（秒），没有弹窗时不再每个选择器都等满共享的10秒
+POPUP_WAIT_TIMEOUT = 1
+
+# 弹窗关闭按钮选择器
+POPUP_SELECTORS = [
+    (".dialog-close", By.CSS_SELECTOR),
+    (".xhs-icon--close", By.CSS_SELECTOR),
+    (".close-btn", By.CSS_SELECTOR),
+    ("//div[@class='dialog']//button[contains(@class, 'close')]", By.XPATH),
+    ("//button[text()='关闭']", By.XPATH),
+    ("//button[text()='取消']", By.XPATH),
+    (".modal-close", By.CSS_SELECTOR),
+    (".xhs-modal-close", By.CSS_SELECTOR),
+    ("close-btn", By.ID)
+]
+
+# 页面内一次性按优先级检查所有弹窗选择器的脚本，每个选择器只点击第一个可见的匹配元素（与逐个显式等待的行为一致），
+# 返回被点击的选择器列表
+_SWEEP_FUNCTION = """
+function sweepPopups(selectors) {
+    var clicked = [], seen = [];
+    selectors.forEach(function (entry) {
+        var selector = entry[0], byType = entry[1], elements = [];
+        try {
+            if (byType === 'xpath') {
+                var snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                for (var i = 0; i < snapshot.snapshotLength; i++) { elements.push(snapshot.snapshotItem(i)); }
+            } else if (byType === 'id') {
+                var element = document.getElementById(selector);
+                if (element) { elements.push(element); }
+            } else {
+                elements = Array.prototype.slice.call(document.querySelectorAll(selector));
+            }
+        } catch (e) {
+            return;
+        }
+        for (var j = 0; j < elements.length; j++) {
+            var candidate = elements[j];
+            var visible = candidate.getClientRects().length > 0 && getComputedStyle(candidate).visibility !== 'hidden';
+            if (visible && !candidate.disabled) {
+                if (seen.indexOf(candidate) === -1) {
+                    seen.push(candidate);
+                    candidate.click();
+                    clicked.push(selector);
+                }
+                return;
+            }
+        }
+    });
+    return clicked;
+}
+"""
+
+SWEEP_SCRIPT = _SWEEP_FUNCTION + "return sweepPopups(arguments[0]);"
+
+# 安装MutationObserver，在弹窗出现时自动关闭（同一页面只安装一次）
+OBSERVER_SCRIPT = _SWEEP_FUNCTION + """
+if (window.__popupObserverInstalled) { return false; }
+window.__popupObserverInstalled = true;
+var selectors = arguments[0], scheduled = false;
+new MutationObserver(function () {
+    if (scheduled) { return; }
+    scheduled = true;
+    setTimeout(function () { scheduled = false; sweepPopups(selectors); }, 50);
+}).observe(document.documentElement, {childList: true, subtree: true});
+return true;
+"""
 
 class PopupHandler:
     """弹窗处理器类"""
     
-    def __init__(self, driver, wait):
+    def __init__(self, driver, wait, fast_mode=False, observe=False, popup_timeout=POPUP_WAIT_TIMEOUT):
         """
         初始化弹窗处理器
         
         Args:
             driver: 浏览器驱动
             wait: 显式等待对象
+            fast_mode: 是否使用单次脚本扫描所有弹窗选择器（默认False，逐个显式等待）；
+                脚本扫描尚未在线上页面验证，可通过命令行参数--fast-popups开启
+            observe: 是否在页面内安装MutationObserver，弹窗出现时自动关闭（默认False，仅fast_mode时生效）
+            popup_timeout: 逐个显式等待时每个选择器的等待上限（秒）
         """
         self.driver = driver
         self.wait = wait
+        self.fast_mode = fast_mode
+        self.observe = observe
+        self.popup_wait = WebDriverWait(driver, popup_timeout)
     
     def handle_popups(self):
         """处理各种弹窗"""
-        popup_selectors = [
-            (".dialog-close", By.CSS_SELECTOR),
-            (".xhs-icon--close", By.CSS_SELECTOR),
-            (".close-btn", By.CSS_SELECTOR),
-            ("//div[@class='dialog']//button[contains(@class, 'close')]", By.XPATH),
-            ("//button[text()='关闭']", By.XPATH),
-            ("//button[text()='取消']", By.XPATH),
-            (".modal-close", By.CSS_SELECTOR),
-            (".xhs-modal-close", By.CSS_SELECTOR),
-            ("#close-btn", By.ID)
-        ]
+        if self.fast_mode:
+            self.sweep_popups()
+            if self.observe:
+                self.install_popup_observer()
+            return
         
         # 延迟1秒，确保弹窗已经加载
-        import time
         time.sleep(1)
         
-        for selector, by_type in popup_selectors:
+        for selector, by_type in POPUP_SELECTORS:
             try:
                 # 尝试查找并点击弹窗关闭按钮
-                element = self.wait.until(EC.element_to_be_clickable((by_type, selector)))
+                element = self.popup_wait.until(EC.element_to_be_clickable((by_type, selector)))
                 element.click()
                 print(f"已关闭弹窗: {selector}")
                 time.sleep(0.5)  # 等待一下，确保弹窗关闭
@@ -50,6 +120,38 @@ class PopupHandler:
                 # 忽略单个弹窗处理失败，继续尝试其他选择器
                 pass
     
+    def sweep_popups(self):
+        """
+        在一次脚本调用中检查所有弹窗选择器，点击当前可见的关闭按钮
+        
+        Returns:
+            list: 被点击的选择器列表
+        """
+        try:
+            clicked = self.driver.execute_script(SWEEP_SCRIPT, [list(entry) for entry in POPUP_SELECTORS]) or []
+            for selector in clicked:
+                print(f"已关闭弹窗: {selector}")
+            return clicked
+        except Exception as e:
+            print(f"扫描弹窗失败: {e}")
+            return []
+    
+    def install_popup_observer(self):
+        """
+        在当前页面安装MutationObserver，弹窗出现时自动关闭；页面跳转后需要重新安装
+        
+        Returns:
+            bool: 本次是否新安装了观察器
+        """
+        try:
+            installed = bool(self.driver.execute_script(OBSERVER_SCRIPT, [list(entry) for entry in POPUP_SELECTORS]))
+            if installed:
+                print("已安装弹窗自动关闭观察器")
+            return installed
+        except Exception as e:
+            print(f"安装弹窗观察器失败: {e}")
+            return False
+    
     def accept_all_cookies(self):
         """接受所有 cookies"""
         try:
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+发布台账，负责记录每条笔记的发布状态，保证重复运行时不会重复发布
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+# 发布状态
+STATUS_PUBLISHED = 'published'
+STATUS_FAILED = 'failed'
+
+class PublishLedger:
+    """基于SQLite的幂等发布台账类"""
+
+    def __init__(self, db_path='publish_ledger.db'):
+        """
+        初始化发布台账
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS publishes ("
+            "note_key TEXT PRIMARY KEY, "
+            "row INTEGER, "
+            "title TEXT, "
+            "status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "updated_at REAL NOT NULL, "
+            "duration REAL, "
+            "error TEXT)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def note_key(note):
+        """
+        根据标题和正文计算笔记的唯一键，同一内容无论位于哪一行都只发布一次
+
+        Args:
+            note: 笔记记录或笔记数据字典
+
+        Returns:
+            str: 笔记唯一键（SHA-256）
+        """
+        # 编译后的笔记按原始标题和正文计算，规范化文本不会导致重复发布
+        note = getattr(note, 'source', None) or note
+        payload = f"{note.get('title') or ''}\n{note.get('content') or ''}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_published(self, note):
+        """
+        判断笔记是否已发布成功
+
+        Args:
+            note: 笔记记录或笔记数据字典
+
+        Returns:
+            bool: 是否已发布
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM publishes WHERE note_key = ?", (self.note_key(note),)
+            ).fetchone()
+        return bool(row) and row[0] == STATUS_PUBLISHED
+
+    def record(self, note, status, duration=None, error=None):
+        """
+        记录一次发布结果
+
+        Args:
+            note: 笔记记录或笔记数据字典
+            status: 发布状态（published/failed）
+            duration: 发布耗时（秒）
+            error: 失败原因
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO publishes (note_key, row, title, status, attempts, updated_at, duration, error) "
+                "VALUES (?, ?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT(note_key) DO UPDATE SET row = excluded.row, title = excluded.title, "
+                "status = excluded.status, attempts = attempts + 1, updated_at = excluded.updated_at, "
+                "duration = excluded.duration, error = excluded.error",
+                (self.note_key(note), note.get('row'), note.get('title'), status, time.time(), duration, error)
+            )
+            self._conn.commit()
+
+    def summary(self):
+        """
+        统计各状态的笔记数量
+
+        Returns:
+            dict: 状态到数量的映射
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM publishes GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        """关闭数据库连接"""
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        """上下文管理器进入方法"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出方法"""
+        self.close()
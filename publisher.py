@@ -6,12 +6,154 @@
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+import os
 import time
+from note_compiler import filter_non_bmp
+from placeholder_images import get_default_pool
+from selector_registry import get_default_registry
+from timing import get_default_recorder
+
+# 各步骤就绪等待的默认上限（秒）
+DEFAULT_WAIT_TIMEOUTS = {
+    'page_ready': 15,       # 发布页加载完成且上传控件可用
+    'upload_ready': 5,      # 点击上传区域后出现文件输入框
+    'image_upload': 30,     # 所有图片缩略图上传完成
+    'editor_ready': 10,     # 标题输入框/正文编辑器挂载完成
+    'tag_added': 3,         # 话题标签被编辑器接收
+    'publish_button': 10,   # 发布按钮可点击
+    'publish_result': 15,   # 发布成功跳转或出现成功提示
+}
+
+# 创作服务平台的图文发布页
+PUBLISH_URL = "https://creator.xiaohongshu.com/publish/publish?from=menu&target=image"
+
+# 发布页元素选择器
+THUMBNAIL_SELECTOR = ".img-preview-area .pr, .img-upload-area .img-container, .upload-item"
+UPLOAD_PROGRESS_SELECTOR = ".upload-progress, .uploading, .d-progress"
+PUBLISH_BUTTON_SELECTOR = "button.d-button.d-button-large.--size-icon-large.--size-text-h6.d-button-with-content.--color-static.bold.--color-bg-fill.--color-text-paragraph.custom-button.red.publishBtn[type='button']"
+PUBLISH_SUCCESS_XPATH = "//div[contains(text(), '发布成功') or contains(text(), 'Published successfully')]"
+TITLE_INPUT_SELECTOR = "input.title-input[placeholder*='标题']"
+EDITOR_SELECTOR = "div.tiptap.ProseMirror[contenteditable='true'][role='textbox']"
+TAG_INPUT_SELECTOR = "input[name='tags'], .tag-input"
+
+# 在页面内一次性填写标题、正文和话题标签（execute_async_script，最后一个参数是回调）
+# 参数：选择器、笔记（title/paragraphs/tags）、等待元素出现的上限（毫秒）
+FILL_FORM_SCRIPT = r"""
+var selectors = arguments[0], note = arguments[1], deadline = Date.now() + arguments[2];
+var done = arguments[arguments.length - 1];
+
+function fire(element, type) {
+    element.dispatchEvent(new Event(type, {bubbles: true}));
+}
+
+function setInputValue(input, value) {
+    // 通过原生setter赋值，框架的受控输入框才能感知到变化
+    var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    input.focus();
+    setter.call(input, value);
+    fire(input, 'input');
+    fire(input, 'change');
+}
+
+function pressEnter(input) {
+    ['keydown', 'keypress', 'keyup'].forEach(function (type) {
+        input.dispatchEvent(new KeyboardEvent(type, {key: 'Enter', code: 'Enter', keyCode: 13, which: 13, bubbles: true}));
+    });
+}
+
+function paragraphsHtml(paragraphs) {
+    var container = document.createElement('div');
+    paragraphs.forEach(function (text) {
+        var p = document.createElement('p');
+        if (text) {
+            p.textContent = text;
+        } else {
+            p.appendChild(document.createElement('br'));
+        }
+        container.appendChild(p);
+    });
+    return container.innerHTML;
+}
+
+function fillEditor(editor, paragraphs) {
+    var html = paragraphsHtml(paragraphs);
+    editor.focus();
+    var range = document.createRange();
+    range.selectNodeContents(editor);
+    var selection = window.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+    // 优先模拟粘贴，由ProseMirror按自己的规则解析段落并更新编辑器状态
+    try {
+        var data = new DataTransfer();
+        data.setData('text/html', html);
+        data.setData('text/plain', paragraphs.join('\n'));
+        var event = new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true});
+        if (!editor.dispatchEvent(event) && editor.textContent.trim()) {
+            return 'paste';
+        }
+    } catch (e) {}
+    // 编辑器没有处理粘贴时直接写入段落，ProseMirror通过DOM变更同步状态
+    editor.innerHTML = html;
+    fire(editor, 'input');
+    return 'dom';
+}
+
+function fill() {
+    var title = note.title ? document.querySelector(selectors.title) : null;
+    var editor = note.paragraphs.length ? document.querySelector(selectors.editor) : null;
+    if ((note.title && !title) || (note.paragraphs.length && !editor)) {
+        if (Date.now() < deadline) {
+            setTimeout(attempt, 50);
+        } else {
+            done({ok: false, error: (note.title && !title) ? '未找到标题输入框' : '未找到正文编辑器'});
+        }
+        return;
+    }
+
+    var result = {ok: true, tags: 0};
+    if (title) {
+        setInputValue(title, note.title);
+        result.title = title.value;
+    }
+    var paragraphs = note.paragraphs.slice();
+    var tagInput = note.tags.length ? document.querySelector(selectors.tags) : null;
+    if (tagInput) {
+        note.tags.forEach(function (tag) {
+            setInputValue(tagInput, tag);
+            pressEnter(tagInput);
+        });
+        result.tags = note.tags.length;
+    } else if (note.tags.length) {
+        // 没有独立的标签输入框时，话题以#标签的形式写在正文最后一段
+        paragraphs.push(note.tags.map(function (tag) { return '#' + tag; }).join(' '));
+        result.tags = note.tags.length;
+    }
+    if (editor) {
+        result.contentMode = fillEditor(editor, paragraphs);
+        result.contentLength = editor.textContent.length;
+    }
+    done(result);
+}
+
+function attempt() {
+    try {
+        fill();
+    } catch (e) {
+        done({ok: false, error: String(e)});
+    }
+}
+
+attempt();
+"""
 
 class Publisher:
     """发布器类"""
     
-    def __init__(self, driver, wait, popup_handler):
+    def __init__(self, driver, wait, popup_handler, wait_timeouts=None, placeholder_pool=None, spans=None,
+                 publish_url=PUBLISH_URL, selectors=None):
         """
         初始化发布器
         
@@ -19,10 +161,58 @@ class Publisher:
             driver: 浏览器驱动
             wait: 显式等待对象
             popup_handler: 弹窗处理器
+            wait_timeouts: 各步骤就绪等待的上限（秒），可选，覆盖DEFAULT_WAIT_TIMEOUTS中的对应项
+            placeholder_pool: 占位图片池，可选，默认使用共享的占位图片池
+            spans: 阶段耗时记录器（SpanRecorder），可选，默认使用共享的记录器
+            publish_url: 图文发布页地址，默认创作服务平台，基准测试时可指向本地模拟页面
+            selectors: 选择器注册表（SelectorRegistry），可选，默认使用共享的注册表
         """
         self.driver = driver
         self.wait = wait
         self.popup_handler = popup_handler
+        self.wait_timeouts = dict(DEFAULT_WAIT_TIMEOUTS, **(wait_timeouts or {}))
+        self.step_timings = {}  # 当前笔记各步骤的实际等待耗时（秒）
+        self.placeholder_pool = placeholder_pool
+        self.spans = spans
+        self.publish_url = publish_url
+        self.selectors = selectors or get_default_registry()
+    
+    def _span(self, name, **attrs):
+        """
+        记录一个发布阶段的耗时
+        
+        Args:
+            name: 阶段名
+            **attrs: 附加字段
+        
+        Returns:
+            上下文管理器
+        """
+        return (self.spans or get_default_recorder()).span(name, **attrs)
+    
+    def _wait_until(self, step, condition):
+        """
+        等待条件满足，等待上限由步骤名决定，并记录实际等待耗时
+        
+        Args:
+            step: 步骤名，对应wait_timeouts中的键
+            condition: 等待条件，接收driver并返回真值
+        
+        Returns:
+            条件满足时的返回值，超时抛出TimeoutException
+        """
+        start_time = time.time()
+        try:
+            return WebDriverWait(self.driver, self.wait_timeouts[step], poll_frequency=0.2).until(condition)
+        finally:
+            self.step_timings[step] = self.step_timings.get(step, 0) + time.time() - start_time
+    
+    def _report_step_timings(self):
+        """打印当前笔记各步骤的等待耗时"""
+        if not self.step_timings:
+            return
+        details = '，'.join(f"{step} {elapsed:.2f}s" for step, elapsed in self.step_timings.items())
+        print(f"各步骤等待耗时：{details}（合计 {sum(self.step_timings.values()):.2f}s）")
     
     def publish_note(self, note_data):
         """
@@ -34,51 +224,140 @@ class Publisher:
         Returns:
             bool: 发布是否成功
         """
+        self.step_timings = {}
+        row = note_data.get('row')
         try:
-            # # 处理弹窗
-            # self.popup_handler.handle_popups()
-            
-            # 检查当前URL，判断是否为创作服务平台
-            # current_url = self.driver.current_url
-            # is_creator_platform = "creator.xiaohongshu.com" in current_url
-            
-            # if is_creator_platform:
-            #     # 创作服务平台发布流程
-            print("使用创作服务平台发布笔记")
-            # 跳转到发布图文页面
-            self.driver.get("https://creator.xiaohongshu.com/publish/publish?from=menu&target=image")
-            time.sleep(3)  # 等待页面加载
-            
-            # # 处理弹窗
-            # self.popup_handler.handle_popups()
-            
-            # 添加上传图片
-            self._add_images(note_data.get('image_paths'))
-            
-            # 输入标题
-            if note_data.get('title'):
-                self._input_title(note_data['title'])
-            
-            # 输入正文内容
-            if note_data.get('content'):
-                self._input_content(note_data['content'])
-            
-            # # 选择话题标签
-            # if note_data.get('tags'):
-            #     self._add_tags(note_data['tags'])
-            
-            # # 选择分类
-            # if note_data.get('category'):
-            #     self._select_category(note_data['category'])
-            
-            # 点击发布按钮
-            self._click_publish_button()
-            time.sleep(2)  # 等待发布完成
-            # # 检查发布结果
-            # return self._check_publish_result()
+            with self._span('publish.total', row=row) as total:
+                # # 处理弹窗
+                # self.popup_handler.handle_popups()
+                
+                # 检查当前URL，判断是否为创作服务平台
+                # current_url = self.driver.current_url
+                # is_creator_platform = "creator.xiaohongshu.com" in current_url
+                
+                # if is_creator_platform:
+                #     # 创作服务平台发布流程
+                print("使用创作服务平台发布笔记")
+                # 跳转到发布图文页面
+                with self._span('publish.navigate', row=row):
+                    self.driver.get(self.publish_url)
+                    self._wait_for_page_ready()
+                
+                # # 处理弹窗
+                # self.popup_handler.handle_popups()
+                
+                # 添加上传图片
+                with self._span('publish.upload', row=row):
+                    self._add_images(note_data.get('image_paths'))
+                
+                # 一次脚本调用填写标题、正文和话题标签，失败时逐项输入
+                if note_data.get('title') or note_data.get('content'):
+                    with self._span('publish.fill', row=row):
+                        if not self._fill_form(note_data):
+                            if note_data.get('title'):
+                                self._input_title(note_data['title'])
+                            if note_data.get('content'):
+                                self._input_content(note_data['content'])
+                
+                # # 选择分类
+                # if note_data.get('category'):
+                #     self._select_category(note_data['category'])
+                
+                # 点击发布按钮
+                with self._span('publish.click', row=row):
+                    self._click_publish_button()
+                
+                # 检查发布结果
+                with self._span('publish.result', row=row) as result_span:
+                    success = self._check_publish_result()
+                    result_span['ok'] = success
+                total['ok'] = success
+                return success
         except Exception as e:
             print(f"发布笔记过程中发生错误: {e}")
             return False
+        finally:
+            self._report_step_timings()
+    
+    def _wait_for_page_ready(self):
+        """等待发布页加载完成且上传控件可用"""
+        try:
+            self._wait_until('page_ready', lambda driver: self.selectors.probe(
+                driver, 'publish.upload_input', require_ready=True
+            ))
+        except TimeoutException:
+            print("等待发布页加载超时，继续执行")
+    
+    def _wait_for_thumbnails(self, expected_count):
+        """
+        等待图片缩略图数量达到预期且没有正在上传的图片
+        
+        Args:
+            expected_count: 预期的缩略图数量
+        
+        Returns:
+            bool: 是否在等待上限内完成上传
+        """
+        try:
+            self._wait_until('image_upload', lambda driver: driver.execute_script(
+                "return document.querySelectorAll(arguments[0]).length >= arguments[2]"
+                " && document.querySelectorAll(arguments[1]).length === 0;",
+                THUMBNAIL_SELECTOR, UPLOAD_PROGRESS_SELECTOR, expected_count
+            ))
+            return True
+        except TimeoutException:
+            print(f"等待图片上传完成超时（预期 {expected_count} 张）")
+            return False
+    
+    def _count_thumbnails(self):
+        """
+        统计当前已有的图片缩略图数量
+        
+        Returns:
+            int: 缩略图数量
+        """
+        return self.driver.execute_script("return document.querySelectorAll(arguments[0]).length;", THUMBNAIL_SELECTOR)
+    
+    def _fill_form(self, note_data):
+        """
+        在一次脚本调用中填写标题、正文（按行拆分为ProseMirror段落）和话题标签，并触发编辑器需要的输入事件
+        
+        Args:
+            note_data: 笔记数据，包含标题、内容和话题标签
+        
+        Returns:
+            bool: 是否填写成功，失败时由调用方逐项输入
+        """
+        title = self._filter_non_bmp(note_data.get('title') or '')
+        content = self._filter_non_bmp(note_data.get('content') or '')
+        note = {
+            'title': title,
+            'paragraphs': content.split('\n') if content else [],
+            'tags': [self._filter_non_bmp(tag) for tag in note_data.get('tags') or [] if tag]
+        }
+        selectors = {'title': TITLE_INPUT_SELECTOR, 'editor': EDITOR_SELECTOR, 'tags': TAG_INPUT_SELECTOR}
+        
+        # 等待编辑器挂载也在页面内完成，整个填写过程只需一次往返
+        start_time = time.time()
+        try:
+            result = self.driver.execute_async_script(FILL_FORM_SCRIPT, selectors, note,
+                                                      int(self.wait_timeouts['editor_ready'] * 1000))
+        except Exception as e:
+            print(f"一次性填写表单失败，改为逐项输入: {e}")
+            return False
+        finally:
+            self.step_timings['editor_ready'] = self.step_timings.get('editor_ready', 0) + time.time() - start_time
+        
+        if not result or not result.get('ok'):
+            print(f"一次性填写表单失败，改为逐项输入: {(result or {}).get('error')}")
+            return False
+        if title:
+            print(f"已输入标题: {result.get('title')}")
+        if content:
+            print(f"已输入正文内容（{result.get('contentLength')} 字，{result.get('contentMode')}）")
+        if result.get('tags'):
+            print(f"已添加 {result['tags']} 个话题标签")
+        return True
     
     def _input_title(self, title):
         """
@@ -92,7 +371,7 @@ class Publisher:
             filtered_title = self._filter_non_bmp(title)
             
             # 查找标题输入框
-            title_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input.title-input[placeholder*='标题']")))
+            title_input = self._wait_until('editor_ready', EC.presence_of_element_located((By.CSS_SELECTOR, TITLE_INPUT_SELECTOR)))
             title_input.clear()
             title_input.send_keys(filtered_title)
             print(f"已输入标题: {filtered_title}")
@@ -109,7 +388,8 @@ class Publisher:
         Returns:
             str: 只包含BMP字符的文本
         """
-        return ''.join(c for c in text if ord(c) <= 0xFFFF)
+        # 经过NoteCompiler编译的笔记已过滤，这里只处理直接传入的文本
+        return filter_non_bmp(text)
     
     def _input_content(self, content):
         """
@@ -123,11 +403,10 @@ class Publisher:
             filtered_content = self._filter_non_bmp(content)
             
             # 查找正文输入框，使用更精准的CSS选择器匹配contenteditable div元素
-            content_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.tiptap.ProseMirror[contenteditable='true'][role='textbox']")))
+            content_input = self._wait_until('editor_ready', EC.visibility_of_element_located((By.CSS_SELECTOR, EDITOR_SELECTOR)))
             
             # 使用JavaScript设置内容，避免send_keys的字符限制问题
             self.driver.execute_script("arguments[0].innerHTML = '';", content_input)
-            time.sleep(1)
             self.driver.execute_script("arguments[0].textContent = arguments[1];", content_input, filtered_content)
             print(f"已输入正文内容")
         except Exception as e:
@@ -145,13 +424,17 @@ class Publisher:
         """
         try:
             # 查找标签输入框
-            tag_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[name='tags'], .tag-input")))
+            tag_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, TAG_INPUT_SELECTOR)))
             
             for tag in tags:
                 tag_input.send_keys(tag)
                 tag_input.send_keys(" ")  # 发送空格，触发标签添加
+                # 输入框被清空说明标签已被接收
+                try:
+                    self._wait_until('tag_added', lambda driver: not tag_input.get_attribute('value').strip())
+                except TimeoutException:
+                    print(f"等待标签添加超时: {tag}")
                 print(f"已添加标签: {tag}")
-                time.sleep(1)  # 等待标签添加
         except Exception as e:
             print(f"添加标签失败: {e}")
     
@@ -180,7 +463,8 @@ class Publisher:
         """
         try:
             # 使用精确的CSS选择器查找发布按钮
-            publish_button = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "button.d-button.d-button-large.--size-icon-large.--size-text-h6.d-button-with-content.--color-static.bold.--color-bg-fill.--color-text-paragraph.custom-button.red.publishBtn[type='button']")))
+            # 等待发布按钮可点击（图片上传完成前按钮处于禁用状态）
+            publish_button = self._wait_until('publish_button', EC.element_to_be_clickable((By.CSS_SELECTOR, PUBLISH_BUTTON_SELECTOR)))
             publish_button.click()
             print("已点击发布按钮")
         except Exception as e:
@@ -194,26 +478,19 @@ class Publisher:
             bool: 发布是否成功
         """
         try:
-            # 等待发布结果
-            time.sleep(10)
-            
-            # 检查当前URL，判断是否发布成功
-            current_url = self.driver.current_url
-            print(f"发布后URL: {current_url}")
-            
-            if "published" in current_url or "success" in current_url.lower() or "dashboard" in current_url:
-                print("发布成功！")
-                return True
-            else:
-                # 检查页面中是否有发布成功的提示
-                try:
-                    success_message = self.wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(text(), '发布成功') or contains(text(), 'Published successfully')]")))
-                    if success_message:
-                        print("发布成功！")
-                        return True
-                except Exception as e:
-                    print(f"未找到发布成功提示: {e}")
+            # 等待发布成功跳转或出现成功提示
+            def _published(driver):
+                current_url = driver.current_url
+                if "published" in current_url or "success" in current_url.lower() or "dashboard" in current_url:
+                    return True
+                return bool(driver.find_elements(By.XPATH, PUBLISH_SUCCESS_XPATH))
             
+            self._wait_until('publish_result', _published)
+            print(f"发布后URL: {self.driver.current_url}")
+            print("发布成功！")
+            return True
+        except TimeoutException:
+            print(f"发布后URL: {self.driver.current_url}")
             print("发布失败！")
             return False
         except Exception as e:
@@ -230,105 +507,36 @@ class Publisher:
         try:
             print("开始处理图片上传...")
             
-            # 尝试多种方式定位和处理图片上传
-            file_input = None
+            # 所有候选选择器在一次页面内查询中同时探测，候选见selectors.json
+            file_input = self.selectors.probe(self.driver, 'publish.upload_input')
             upload_success = False
             
-            try:
-                # 方式1：直接查找文件上传输入框
-                print("尝试直接查找文件上传输入框...")
-                file_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input.upload-input[type='file']")))
-                print("成功找到文件上传输入框")
-            except Exception as e1:
-                print(f"直接查找文件上传输入框失败: {e1}")
-                
-                # 方式2：先点击上传区域，再查找文件上传输入框
+            if file_input is None:
+                # 页面上还没有文件上传输入框时，先点击上传区域，再等待输入框出现
                 try:
-                    print("尝试先点击上传区域...")
-                    upload_area = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, ".upload-area")))
-                    upload_area.click()
-                    print("成功点击上传区域")
-                    time.sleep(1)  # 等待上传区域展开
-                    
-                    # 再次尝试查找文件上传输入框
-                    file_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
+                    print("未找到文件上传输入框，尝试先点击上传区域...")
+                    self.selectors.find(self.driver, 'publish.upload_area', self.wait_timeouts['upload_ready']).click()
+                    file_input = self._wait_until('upload_ready', lambda driver: self.selectors.probe(
+                        driver, 'publish.upload_input'
+                    ))
                     print("点击上传区域后成功找到文件上传输入框")
-                except Exception as e2:
-                    print(f"点击上传区域后查找文件上传输入框失败: {e2}")
-                    
-                    # 方式3：尝试使用其他常见的文件上传输入框选择器
-                    try:
-                        print("尝试使用其他常见选择器查找文件上传输入框...")
-                        file_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']")))
-                        print("使用通用选择器成功找到文件上传输入框")
-                    except Exception as e3:
-                        print(f"所有尝试都失败了，无法找到文件上传输入框: {e3}")
-                        # 不再抛出异常，允许继续执行
-                        return
+                except Exception as e:
+                    print(f"无法找到文件上传输入框: {e}")
+                    # 不再抛出异常，允许继续执行
+                    return
             
+            uploaded_count = self._count_thumbnails()
             if image_paths:
-                # 为每个图片路径发送文件路径
-                for image_path in image_paths:
-                    try:
-                        print(f"准备上传图片: {image_path}")
-                        file_input.send_keys(image_path)
-                        print(f"已添加图片: {image_path}")
-                        time.sleep(3)  # 增加等待时间，确保图片上传完成
-                        upload_success = True
-                    except Exception as e:
-                        print(f"上传图片 {image_path} 失败: {e}")
-                        # 继续尝试上传下一张图片
-                        continue
+                upload_success = self._upload_files(file_input, image_paths, uploaded_count)
             else:
-                # 从网络随机生成图片并上传
-                print("没有提供图片路径，将使用随机生成的图片")
-                
-                # 由于Selenium无法直接处理网络图片上传，我们可以使用第三方API获取随机图片
-                import urllib.request
-                import tempfile
-                import os
-                
-                # 生成2张随机图片，增加重试机制
-                for i in range(2):
-                    retry_count = 0
-                    max_retries = 3
-                    success = False
-                    
-                    while retry_count < max_retries and not success:
-                        try:
-                            # 生成1024x1024的随机图片
-                            image_url = f"https://picsum.photos/1024/1024?random={i}_{retry_count}"
-                            
-                            # 下载图片到临时文件
-                            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                                temp_path = temp_file.name
-                            
-                            print(f"尝试下载随机图片 {i+1} (重试 {retry_count+1}/{max_retries}): {image_url}")
-                            urllib.request.urlretrieve(image_url, temp_path)
-                            print(f"已下载随机图片: {image_url} 到临时文件: {temp_path}")
-                            
-                            # 上传图片
-                            file_input.send_keys(temp_path)
-                            print(f"已上传随机图片 {i+1}")
-                            time.sleep(4)  # 增加等待时间，确保图片上传完成
-                            
-                            # 删除临时文件
-                            os.unlink(temp_path)
-                            print(f"已删除临时文件: {temp_path}")
-                            
-                            success = True
-                            upload_success = True
-                            break
-                        except urllib.error.HTTPError as e:
-                            print(f"下载图片时出现HTTP错误: {e}")
-                            retry_count += 1
-                            time.sleep(2)  # 等待2秒后重试
-                        except Exception as e:
-                            print(f"处理随机图片时出现错误: {e}")
-                            break
-                    
-                    if not success:
-                        print(f"无法下载随机图片 {i+1}")
+                # 从本地占位图片池取图并上传，不在发布流程中等待网络下载
+                print("没有提供图片路径，将使用占位图片")
+                placeholder_pool = self.placeholder_pool or get_default_pool()
+                placeholder_paths = placeholder_pool.take(2)
+                try:
+                    upload_success = self._upload_files(file_input, placeholder_paths, uploaded_count)
+                finally:
+                    placeholder_pool.discard(placeholder_paths)
             
             if upload_success:
                 print("图片上传处理完成")
@@ -341,6 +549,83 @@ class Publisher:
             traceback.print_exc()
             # 不抛出异常，允许继续执行后续步骤
     
+    def _upload_files(self, file_input, image_paths, uploaded_count=0):
+        """
+        上传图片文件：优先一次性把所有路径发送给多选文件输入框，页面不支持多选时逐张上传
+        
+        Args:
+            file_input: 文件上传输入框
+            image_paths: 图片路径列表
+            uploaded_count: 上传前已有的缩略图数量
+        
+        Returns:
+            bool: 是否至少有一张图片上传成功且所有已添加的图片都在等待上限内上传完成
+        """
+        image_paths = [os.path.abspath(image_path) for image_path in image_paths]
+        
+        # 批量上传：多个路径用换行分隔一次发送，然后统一等待所有缩略图完成
+        upload_success = False
+        if len(image_paths) > 1 and file_input.get_attribute('multiple') is not None:
+            try:
+                print(f"批量上传 {len(image_paths)} 张图片")
+                file_input.send_keys("\n".join(image_paths))
+            except Exception as e:
+                print(f"批量上传图片失败，改为逐张上传: {e}")
+                uploaded_count = self._count_thumbnails()
+            else:
+                accepted_names = self._selected_file_names(file_input)
+                if len(accepted_names) != 1:
+                    if self._wait_for_thumbnails(uploaded_count + len(image_paths)):
+                        print(f"已批量添加 {len(image_paths)} 张图片")
+                        return True
+                    # 缩略图选择器未必与线上页面一致，无法确认页面接受了哪些图片，重新上传可能重复添加
+                    return False
+                # 输入框只保留了一个文件，其余图片逐张上传
+                print(f"文件输入框只接受了 1/{len(image_paths)} 张图片，其余改为逐张上传")
+                uploaded_count += 1
+                if not self._wait_for_thumbnails(uploaded_count):
+                    return False
+                upload_success = True
+                accepted = [path for path in image_paths if os.path.basename(path) == accepted_names[0]]
+                image_paths = list(image_paths)
+                image_paths.remove(accepted[0] if accepted else image_paths[0])
+        
+        # 逐张上传（页面拒绝多选时的回退方式）
+        for image_path in image_paths:
+            try:
+                print(f"准备上传图片: {image_path}")
+                file_input.send_keys(image_path)
+                print(f"已添加图片: {image_path}")
+                # 等待该图片缩略图出现且上传进度结束
+                uploaded_count += 1
+                if not self._wait_for_thumbnails(uploaded_count):
+                    return False
+                upload_success = True
+            except Exception as e:
+                print(f"上传图片 {image_path} 失败: {e}")
+                # 继续尝试上传下一张图片
+                continue
+        return upload_success
+    
+    def _selected_file_names(self, file_input):
+        """
+        读取文件输入框当前保留的文件名
+        
+        Args:
+            file_input: 文件上传输入框
+        
+        Returns:
+            list: 文件名列表，读取失败时返回空列表
+        """
+        try:
+            return self.driver.execute_script(
+                "return Array.prototype.map.call(arguments[0].files || [], function (file) { return file.name; });",
+                file_input
+            ) or []
+        except Exception as e:
+            print(f"读取文件输入框的文件列表失败: {e}")
+            return []
+    
     def _add_random_image(self, max_images=9):
         """
         添加随机图片（备用方法）
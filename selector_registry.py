@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+选择器注册表，负责从配置文件加载页面元素的候选选择器，在一次页面内查询中探测所有候选并记录实际命中的选择器
+"""
+
+import json
+import os
+import threading
+from selenium.webdriver.support.ui import WebDriverWait
+
+# 候选选择器配置文件，页面改版时只需修改此文件
+SELECTORS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'selectors.json')
+
+# 元素需要满足的条件
+CONDITION_PRESENT = 'present'      # 元素存在于DOM中
+CONDITION_VISIBLE = 'visible'      # 元素可见
+CONDITION_CLICKABLE = 'clickable'  # 元素可见且未禁用
+
+# 按配置顺序（优先级）探测所有候选选择器，返回优先级最高的满足条件的元素及其序号
+# 参数：候选列表（[类型, 选择器]）、条件、是否要求页面加载完成
+_PROBE_SCRIPT = """
+var candidates = arguments[0], condition = arguments[1], requireReady = arguments[2];
+if (requireReady && document.readyState !== 'complete') {
+    return null;
+}
+function matches(element) {
+    if (condition === 'present') {
+        return true;
+    }
+    var visible = element.getClientRects().length > 0 && getComputedStyle(element).visibility !== 'hidden';
+    return visible && (condition === 'visible' || !element.disabled);
+}
+for (var i = 0; i < candidates.length; i++) {
+    var type = candidates[i][0], selector = candidates[i][1], found = [];
+    try {
+        if (type === 'xpath') {
+            var result = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (var j = 0; j < result.snapshotLength; j++) {
+                found.push(result.snapshotItem(j));
+            }
+        } else {
+            found = document.querySelectorAll(selector);
+        }
+    } catch (e) {
+        // 选择器写错时跳过，不影响其他候选
+        continue;
+    }
+    for (var k = 0; k < found.length; k++) {
+        if (matches(found[k])) {
+            return [i, found[k]];
+        }
+    }
+}
+return null;
+"""
+
+class SelectorRegistry:
+    """选择器注册表类，在一次页面内查询中按配置的优先级探测所有候选选择器"""
+
+    def __init__(self, config_path=SELECTORS_PATH, state_path='selector_state.json'):
+        """
+        初始化选择器注册表
+
+        Args:
+            config_path: 候选选择器配置文件路径（JSON）
+            state_path: 记录每个元素上次命中的选择器的文件路径，启动时据此提示上次运行中首选选择器已失效的元素，
+                None表示不持久化
+        """
+        self.config_path = config_path
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self.elements = self._load_json(config_path, required=True)
+        self.last_matched = self._load_json(state_path) if state_path else {}
+        self.report_stale_selectors()
+
+    @staticmethod
+    def _load_json(path, required=False):
+        """
+        读取JSON文件
+
+        Args:
+            path: 文件路径
+            required: 文件不存在或损坏时是否抛出异常
+
+        Returns:
+            dict: 文件内容，可选文件不存在或损坏时返回空字典
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            if required:
+                raise
+            if os.path.exists(path):
+                print(f"读取选择器记录失败: {e}")
+            return {}
+
+    def candidates(self, name):
+        """
+        按配置文件中的顺序（即优先级）获取元素的候选选择器
+
+        通用的备选选择器（如input[type='file']）也能匹配首选选择器匹配的元素，
+        因此始终以配置顺序为准，上次命中的记录不改变探测顺序，
+        首选选择器只是偶尔晚于页面渲染时也不会被备选长期取代。
+
+        Args:
+            name: 元素名，如 login.phone_input
+
+        Returns:
+            list: [类型, 选择器] 列表，类型为css或xpath
+        """
+        if name not in self.elements:
+            raise KeyError(f"选择器配置中没有元素: {name}")
+        configured = []
+        for candidate in self.elements[name]['candidates']:
+            for selector_type in ('css', 'xpath'):
+                if candidate.get(selector_type):
+                    configured.append([selector_type, candidate[selector_type]])
+        return configured
+
+    def stale_selectors(self):
+        """
+        找出上次运行时首选选择器未命中、改用了备选选择器的元素
+
+        Returns:
+            dict: 元素名到上次命中的 [类型, 选择器] 的映射；已从配置中删除的元素或选择器不计入
+        """
+        stale = {}
+        for name, candidate in self.last_matched.items():
+            if name not in self.elements:
+                continue
+            configured = self.candidates(name)
+            if candidate in configured and candidate != configured[0]:
+                stale[name] = candidate
+        return stale
+
+    def report_stale_selectors(self):
+        """启动时提示首选选择器已失效的元素，提醒更新selectors.json"""
+        for name, candidate in self.stale_selectors().items():
+            print(f"上次运行时元素 {name} 的首选选择器未命中，使用的是备选: {candidate[1]}，"
+                  f"页面可能已改版，请检查 {os.path.basename(self.config_path)}")
+
+    def probe(self, driver, name, require_ready=False):
+        """
+        在一次页面内查询中探测元素的所有候选选择器
+
+        Args:
+            driver: 浏览器驱动
+            name: 元素名
+            require_ready: 是否要求页面已加载完成（document.readyState为complete）
+
+        Returns:
+            WebElement: 优先级最高的满足条件的元素，没有时返回None
+        """
+        candidates = self.candidates(name)
+        condition = self.elements[name].get('condition', CONDITION_PRESENT)
+        result = driver.execute_script(_PROBE_SCRIPT, candidates, condition, require_ready)
+        if not result:
+            return None
+        index, element = result
+        self._remember(name, candidates[int(index)])
+        return element
+
+    def find(self, driver, name, timeout=10, poll_frequency=0.2):
+        """
+        等待元素出现，每次轮询都在页面内同时探测所有候选选择器
+
+        Args:
+            driver: 浏览器驱动
+            name: 元素名
+            timeout: 等待上限（秒），所有候选共用
+            poll_frequency: 轮询间隔（秒）
+
+        Returns:
+            WebElement: 找到的元素，超时抛出TimeoutException
+        """
+        return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+            lambda current_driver: self.probe(current_driver, name),
+            f"所有候选选择器都未找到元素: {name}"
+        )
+
+    def _remember(self, name, candidate):
+        """
+        记录元素本次命中的选择器，与上次不同时保存
+
+        Args:
+            name: 元素名
+            candidate: 命中的 [类型, 选择器]
+        """
+        with self._lock:
+            if self.last_matched.get(name) == candidate:
+                return
+            self.last_matched[name] = candidate
+            if candidate != self.candidates(name)[0]:
+                print(f"元素 {name} 的首选选择器未命中，改用: {candidate[1]}")
+            if not self.state_path:
+                return
+            try:
+                temp_path = f"{self.state_path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.last_matched, f, ensure_ascii=False, indent=2)
+                os.replace(temp_path, self.state_path)
+            except Exception as e:
+                print(f"保存选择器记录失败: {e}")
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+def get_default_registry():
+    """
+    获取共享的选择器注册表，首次调用时加载配置文件
+
+    Returns:
+        SelectorRegistry: 共享的选择器注册表
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = SelectorRegistry()
+        return _default_registry
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会话存储，负责保存和恢复登录后的Cookie与本地存储
+"""
+
+import json
+import os
+import threading
+import time
+
+# 读取页面localStorage和sessionStorage的脚本
+_READ_STORAGE_SCRIPT = """
+function dump(storage) {
+    var data = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        data[key] = storage.getItem(key);
+    }
+    return data;
+}
+return {origin: location.origin, local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# 写入页面localStorage和sessionStorage的脚本
+_WRITE_STORAGE_SCRIPT = """
+var local = arguments[0] || {}, session = arguments[1] || {};
+Object.keys(local).forEach(function (key) { window.localStorage.setItem(key, local[key]); });
+Object.keys(session).forEach(function (key) { window.sessionStorage.setItem(key, session[key]); });
+"""
+
+class SessionStore:
+    """登录会话快照类，保存到JSON文件，可恢复到新的浏览器实例"""
+
+    def __init__(self, snapshot_path='session_snapshot.json', max_age=7 * 24 * 3600):
+        """
+        初始化会话存储
+
+        Args:
+            snapshot_path: 快照文件路径（包含登录凭证，请勿提交或分享）
+            max_age: 快照的最长有效时间（秒），超过后不再恢复
+        """
+        self.snapshot_path = snapshot_path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def save(self, driver):
+        """
+        保存当前页面的Cookie和本地存储
+
+        Args:
+            driver: 浏览器驱动（需停留在已登录的页面上）
+        """
+        storage = driver.execute_script(_READ_STORAGE_SCRIPT)
+        snapshot = {
+            'saved_at': time.time(),
+            'origin': storage['origin'],
+            'cookies': driver.get_cookies(),
+            'local_storage': storage['local'],
+            'session_storage': storage['session']
+        }
+        with self._lock:
+            temp_path = f"{self.snapshot_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(temp_path, self.snapshot_path)
+        print(f"已保存登录会话快照: {len(snapshot['cookies'])} 个Cookie")
+
+    def load(self):
+        """
+        读取会话快照
+
+        Returns:
+            dict: 快照内容，不存在、损坏或已过期时返回None
+        """
+        with self._lock:
+            if not os.path.exists(self.snapshot_path):
+                return None
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取登录会话快照失败: {e}")
+                return None
+        if self.max_age is not None and time.time() - snapshot.get('saved_at', 0) > self.max_age:
+            print("登录会话快照已过期")
+            return None
+        return snapshot
+
+    def restore_cookies(self, driver, snapshot):
+        """
+        通过DevTools协议写入Cookie，无需先打开目标域名的页面
+
+        Args:
+            driver: 浏览器驱动
+            snapshot: 会话快照
+        """
+        cookies = []
+        for cookie in snapshot.get('cookies', []):
+            param = {
+                'name': cookie['name'],
+                'value': cookie['value'],
+                'domain': cookie.get('domain'),
+                'path': cookie.get('path', '/'),
+                'secure': cookie.get('secure', False),
+                'httpOnly': cookie.get('httpOnly', False)
+            }
+            if 'expiry' in cookie:
+                param['expires'] = cookie['expiry']
+            if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+                param['sameSite'] = cookie['sameSite']
+            cookies.append(param)
+        if cookies:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+
+    def restore_storage(self, driver, snapshot):
+        """
+        写入localStorage和sessionStorage（需停留在快照来源的页面上）
+
+        Args:
+            driver: 浏览器驱动
+            snapshot: 会话快照
+        """
+        driver.execute_script(_WRITE_STORAGE_SCRIPT, snapshot.get('local_storage'), snapshot.get('session_storage'))
+
+    def clear(self):
+        """删除会话快照"""
+        with self._lock:
+            if os.path.exists(self.snapshot_path):
+                os.remove(self.snapshot_path)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试自适应并发控制的错误分类、并发调整和重试逻辑
+"""
+
+from adaptive_concurrency import (
+    classify_error, retry_after_seconds, AdaptiveLimiter, RetryPolicy, GenerationController,
+    OUTCOME_SUCCESS, OUTCOME_OVERLOAD, OUTCOME_RETRYABLE, OUTCOME_FATAL
+)
+
+class StatusError(Exception):
+    """带状态码和响应头的模拟API异常"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type('Response', (), {'status_code': status_code, 'headers': headers or {}})()
+
+class ReadTimeout(Exception):
+    """类名包含Timeout的模拟超时异常"""
+
+def test_classify_error():
+    """测试调用异常的分类"""
+    assert classify_error(StatusError(429)) == OUTCOME_OVERLOAD
+    assert classify_error(StatusError(504)) == OUTCOME_OVERLOAD
+    assert classify_error(ReadTimeout()) == OUTCOME_OVERLOAD
+    assert classify_error(TimeoutError()) == OUTCOME_OVERLOAD
+    assert classify_error(StatusError(500)) == OUTCOME_RETRYABLE
+    assert classify_error(ConnectionError()) == OUTCOME_RETRYABLE
+    assert classify_error(StatusError(401)) == OUTCOME_FATAL
+    assert classify_error(ValueError("bad request")) == OUTCOME_FATAL
+
+def test_retry_after_seconds():
+    """测试读取限流响应建议的等待时间"""
+    assert retry_after_seconds(StatusError(429, {'retry-after': '2'})) == 2.0
+    assert retry_after_seconds(StatusError(429, {'retry-after-ms': '1500'})) == 1.5
+    assert retry_after_seconds(StatusError(429, {'retry-after': 'soon'})) is None
+    assert retry_after_seconds(ValueError()) is None
+
+def test_limiter_increase():
+    """测试成功时大约每完成“当前并发数”个调用增加1个并发"""
+    limiter = AdaptiveLimiter(initial=2, max_limit=3)
+    for expected in (2, 2, 3, 3, 3, 3):
+        limiter.acquire()
+        limiter.release(OUTCOME_SUCCESS)
+        assert limiter.limit == expected
+    assert limiter.increases == 1
+
+def test_limiter_decrease_and_cooldown():
+    """测试限流时并发数减半，冷却期内的多次限流只减小一次，且不低于下限"""
+    limiter = AdaptiveLimiter(initial=8, max_limit=8, cooldown=60.0)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(OUTCOME_OVERLOAD)
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+    limiter = AdaptiveLimiter(initial=8, max_limit=8, cooldown=0.0)
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(OUTCOME_OVERLOAD)
+    assert limiter.limit == 1
+    # 可重试的错误不改变并发数
+    limiter.acquire()
+    limiter.release(OUTCOME_RETRYABLE)
+    assert limiter.limit == 1
+
+def test_retry_policy_delay():
+    """测试退避时间不超过上限且不低于服务端建议的等待时间"""
+    policy = RetryPolicy(base_delay=0.5, max_delay=4.0)
+    for attempt in range(1, 10):
+        assert 0 <= policy.delay(attempt) <= min(4.0, 0.5 * 2 ** (attempt - 1))
+    assert policy.delay(1, retry_after=3.0) >= 3.0
+    assert policy.delay(1, retry_after=100.0) == 4.0
+
+def test_controller_retries():
+    """测试可重试的错误按次数重试，不可重试的错误立即抛出"""
+    controller = GenerationController(AdaptiveLimiter(initial=2, max_limit=2),
+                                      RetryPolicy(max_attempts=3, base_delay=0.001))
+    failures = [StatusError(500), StatusError(429)]
+
+    def flaky():
+        if failures:
+            raise failures.pop(0)
+        return 'ok'
+
+    assert controller.call(flaky) == 'ok'
+    assert controller.calls == 3 and controller.retries == 2 and controller.overloads == 1
+
+    calls = []
+
+    def fatal():
+        calls.append(1)
+        raise StatusError(401)
+
+    try:
+        controller.call(fatal)
+        assert False, "不可重试的错误应直接抛出"
+    except StatusError:
+        pass
+    assert len(calls) == 1
+
+    calls.clear()
+
+    def always_busy():
+        calls.append(1)
+        raise StatusError(503)
+
+    try:
+        controller.call(always_busy)
+        assert False, "重试次数用尽后应抛出最后一次的异常"
+    except StatusError:
+        pass
+    assert len(calls) == 3
+
+if __name__ == "__main__":
+    test_classify_error()
+    test_retry_after_seconds()
+    test_limiter_increase()
+    test_limiter_decrease_and_cooldown()
+    test_retry_policy_delay()
+    test_controller_retries()
+    print("自适应并发控制测试通过")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试批量生成响应的解析和内容截断
+"""
+
+import json
+from llm_client import parse_batch_response, trim_to_sentence
+
+def test_parse_batch_response():
+    """测试按序号拆分批量响应"""
+    text = json.dumps({'items': [{'index': 2, 'content': '第二条'}, {'index': 1, 'content': '第一条'}]},
+                      ensure_ascii=False)
+    assert parse_batch_response(text, 2) == ['第一条', '第二条']
+
+def test_parse_batch_response_code_fence():
+    """测试模型把JSON包在代码块或说明文字中的情况"""
+    fenced = '```json\n{"items": [{"index": 1, "content": "内容"}]}\n```'
+    assert parse_batch_response(fenced, 1) == ['内容']
+    wrapped = '好的，结果如下：{"items": [{"index": 1, "content": "内容"}]} 以上。'
+    assert parse_batch_response(wrapped, 1) == ['内容']
+
+def test_parse_batch_response_bad_items():
+    """测试越界、重复、空内容和非法序号的条目被忽略"""
+    text = json.dumps({'items': [
+        {'index': 1, 'content': '第一条'},
+        {'index': 1, 'content': '重复的第一条'},
+        {'index': 0, 'content': '越界'},
+        {'index': 4, 'content': '越界'},
+        {'index': 'x', 'content': '非法序号'},
+        {'index': 2, 'content': '   '},
+        {'index': '3', 'content': '字符串序号'},
+    ]}, ensure_ascii=False)
+    assert parse_batch_response(text, 3) == ['第一条', None, '字符串序号']
+
+def test_parse_batch_response_malformed():
+    """测试格式错误的响应返回全部为None的列表"""
+    assert parse_batch_response('不是JSON', 2) == [None, None]
+    assert parse_batch_response('{"items": [{"index": 1', 2) == [None, None]
+    assert parse_batch_response('{"items": "内容"}', 1) == [None]
+    assert parse_batch_response(None, 1) == [None]
+    # 字符串数组按位置对应
+    assert parse_batch_response('["一", "二"]', 2) == ['一', '二']
+
+def test_trim_to_sentence():
+    """测试截断时优先在句子边界断开"""
+    assert trim_to_sentence('  短内容。 ', 10) == '短内容。'
+    assert trim_to_sentence('第一句。第二句很长很长', 8) == '第一句。'
+    # 句子边界过早时直接按字符截断
+    assert trim_to_sentence('短。后面是很长很长的一句话', 10) == '短。后面是很长很长的'
+    assert len(trim_to_sentence('字' * 1000, 700)) == 700
+
+if __name__ == "__main__":
+    test_parse_batch_response()
+    test_parse_batch_response_code_fence()
+    test_parse_batch_response_bad_items()
+    test_parse_batch_response_malformed()
+    test_trim_to_sentence()
+    print("批量响应解析测试通过")
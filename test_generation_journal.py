@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试生成日志的追加写入和崩溃后回放
+"""
+
+import os
+import shutil
+import tempfile
+from generation_journal import GenerationJournal
+
+def test_journal_replay():
+    """测试同一行以最后一条记录为准，写了一半的最后一行被忽略"""
+    work_dir = tempfile.mkdtemp(prefix='journal_test_')
+    try:
+        journal = GenerationJournal(os.path.join(work_dir, 'notes.xlsx.journal.jsonl'))
+        assert journal.replay() == {}
+
+        journal.append(2, '标题一', '模板内容', fallback=True)
+        journal.append(3, '标题二', '内容二')
+        journal.append(2, '标题一', '重新生成的内容')
+        journal.close()
+        # 模拟崩溃时只写了一半的记录
+        with open(journal.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"row": 4, "title": "标题')
+
+        entries = journal.replay()
+        assert sorted(entries) == [2, 3]
+        assert entries[2]['content'] == '重新生成的内容' and not entries[2].get('fallback')
+        assert entries[3]['content'] == '内容二'
+
+        journal.clear()
+        assert not os.path.exists(journal.journal_path)
+        assert journal.replay() == {}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_journal_path_for():
+    """测试日志文件放在Excel文件旁边"""
+    assert GenerationJournal.path_for('data/notes.xlsx') == 'data/notes.xlsx.journal.jsonl'
+
+if __name__ == "__main__":
+    test_journal_replay()
+    test_journal_path_for()
+    print("生成日志测试通过")
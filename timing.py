@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+耗时记录器，负责记录登录、发布等流程中各阶段的耗时并汇总统计
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+def percentile(values, percent):
+    """
+    计算百分位数（最近秩法）
+
+    Args:
+        values: 数值列表
+        percent: 百分位（0-100）
+
+    Returns:
+        float: 百分位数，列表为空时返回None
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class SpanRecorder:
+    """耗时记录器类，每个阶段记录为一条JSON，可同时写入JSON-lines文件"""
+
+    def __init__(self, output_path=None):
+        """
+        初始化耗时记录器
+
+        Args:
+            output_path: JSON-lines输出文件路径，可选，不提供时只保存在内存中
+        """
+        self.output_path = output_path
+        self.records = []
+        self._lock = threading.Lock()
+        self._file = open(output_path, 'a', encoding='utf-8') if output_path else None
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """
+        记录一个阶段的耗时，阶段内抛出异常时记录为失败并继续抛出
+
+        Args:
+            name: 阶段名，如 publish.upload
+            **attrs: 附加字段，如行号
+
+        Yields:
+            dict: 本条记录，可在阶段内补充字段
+        """
+        record = {'name': name, 'start': time.time()}
+        record.update(attrs)
+        start_time = time.perf_counter()
+        try:
+            yield record
+            record.setdefault('ok', True)
+        except BaseException as e:
+            record['ok'] = False
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['duration'] = round(time.perf_counter() - start_time, 4)
+            self._add(record)
+
+    def _add(self, record):
+        """保存一条记录并追加到输出文件"""
+        with self._lock:
+            self.records.append(record)
+            if self._file:
+                self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                self._file.flush()
+
+    def summary(self, prefix=None):
+        """
+        按阶段名汇总耗时
+
+        Args:
+            prefix: 只统计以此开头的阶段名，可选
+
+        Returns:
+            dict: 阶段名到统计信息（count/failed/p50/p95/max，单位秒）的映射
+        """
+        with self._lock:
+            records = [record for record in self.records if not prefix or record['name'].startswith(prefix)]
+        durations = {}
+        failures = {}
+        for record in records:
+            durations.setdefault(record['name'], []).append(record['duration'])
+            failures[record['name']] = failures.get(record['name'], 0) + (not record.get('ok', True))
+        return {
+            name: {
+                'count': len(values),
+                'failed': failures[name],
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'max': max(values)
+            }
+            for name, values in durations.items()
+        }
+
+    def print_summary(self, prefix=None):
+        """
+        打印各阶段耗时的p50/p95/max
+
+        Args:
+            prefix: 只统计以此开头的阶段名，可选
+        """
+        stats = self.summary(prefix)
+        if not stats:
+            return
+        print("\n各阶段耗时统计（秒）：")
+        print(f"{'阶段':<24}{'次数':>6}{'失败':>6}{'p50':>9}{'p95':>9}{'max':>9}")
+        for name, item in stats.items():
+            print(f"{name:<24}{item['count']:>6}{item['failed']:>6}"
+                  f"{item['p50']:>9.2f}{item['p95']:>9.2f}{item['max']:>9.2f}")
+
+    def reset(self):
+        """清空内存中的记录，输出文件保留"""
+        with self._lock:
+            self.records = []
+
+    def close(self):
+        """关闭输出文件"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+_default_recorder = SpanRecorder()
+_default_recorder_lock = threading.Lock()
+
+def get_default_recorder():
+    """
+    获取共享的耗时记录器
+
+    Returns:
+        SpanRecorder: 共享的耗时记录器
+    """
+    return _default_recorder
+
+def configure_default_recorder(output_path=None):
+    """
+    重新创建共享的耗时记录器，例如指定JSON-lines输出文件
+
+    Args:
+        output_path: JSON-lines输出文件路径，可选
+
+    Returns:
+        SpanRecorder: 新的共享耗时记录器
+    """
+    global _default_recorder
+    with _default_recorder_lock:
+        _default_recorder.close()
+        _default_recorder = SpanRecorder(output_path)
+        return _default_recorder